@@ -0,0 +1,42 @@
+import base64
+import pickle
+from datetime import datetime, timezone
+from django.conf import settings
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.db import DatabaseCache as BaseDatabaseCache
+from django.db import connections, router
+
+
+class DatabaseCache(BaseDatabaseCache):
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        connection = connections[router.db_for_write(self.cache_model_class)]
+        if not data or connection.vendor != 'postgresql':
+            return super().set_many(data, timeout=timeout, version=version)
+
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is None:
+            expires = datetime.max
+        else:
+            expires = datetime.fromtimestamp(timeout, tz=timezone.utc if settings.USE_TZ else None)
+        rows = {
+            self.make_and_validate_key(key, version=version):
+                base64.b64encode(pickle.dumps(value, self.pickle_protocol)).decode('latin1')
+            for key, value in data.items()
+        }
+        quote_name = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {quote_name(self._table)} (cache_key, value, expires)
+                SELECT entry.key, entry.value, %(expires)s
+                FROM unnest(%(keys)s::text[], %(values)s::text[]) AS entry(key, value)
+                ON CONFLICT (cache_key) DO UPDATE
+                SET value = EXCLUDED.value, expires = EXCLUDED.expires
+                """,
+                {
+                    'expires': connection.ops.adapt_datetimefield_value(expires.replace(microsecond=0)),
+                    'keys': list(rows),
+                    'values': list(rows.values()),
+                }
+            )
+        return []
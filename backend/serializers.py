@@ -0,0 +1,45 @@
+def parse_field_paths(value):
+    tree = {}
+    for path in filter(None, (part.strip() for part in value.split(','))):
+        node = tree
+        for name in path.split('.'):
+            node = node.setdefault(name, {})
+    return tree
+
+
+class DynamicFieldsMixin:
+    fields_param = 'fields'
+    expand_param = 'expand'
+    expand_by_default = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'context' not in kwargs:
+            return
+        request = kwargs['context'].get('request')
+        params = request.query_params if request is not None and request.method == 'GET' else {}
+
+        if self.fields_param not in params and self.expand_param not in params:
+            if not self.expand_by_default:
+                self.apply_field_spec({}, {})
+            return
+        self.apply_field_spec(
+            parse_field_paths(params.get(self.fields_param, '')),
+            parse_field_paths(params.get(self.expand_param, ''))
+        )
+
+    def apply_field_spec(self, fields, expand):
+        expandable = set(getattr(self.Meta, 'expandable_fields', ()))
+        for name in list(self.fields):
+            if fields:
+                keep = name in fields or name in expand
+            else:
+                keep = name not in expandable or name in expand
+            if not keep:
+                self.fields.pop(name)
+                continue
+
+            nested = self.fields[name]
+            nested = getattr(nested, 'child', nested)
+            if isinstance(nested, DynamicFieldsMixin):
+                nested.apply_field_spec(fields.get(name, {}), expand.get(name, {}))
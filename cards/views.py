@@ -1,9 +1,11 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
-from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 from .models import Cart, CartItem
 from .serializers import CartSerializer, CartItemSerializer, AddToCartSerializer
 from products.models import Product, Seller
+from products.reservations import InsufficientStock, release_stock, reserve_stock
+from order.idempotency import idempotent
 
 class CartDetailView(generics.RetrieveAPIView):
     serializer_class = CartSerializer
@@ -18,34 +20,50 @@ class AddToCartView(generics.CreateAPIView):
     serializer_class = AddToCartSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    @idempotent('cart-add')
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         try:
-            product = Product.objects.get(id=serializer.validated_data['product_id'])
             seller = Seller.objects.get(id=serializer.validated_data['seller_id'])
-        except (Product.DoesNotExist, Seller.DoesNotExist):
+        except Seller.DoesNotExist:
             raise NotFound("محصول یا فروشنده یافت نشد")
 
         cart, _ = Cart.objects.get_or_create(user=request.user)
-        
-        cart_item, created = CartItem.objects.get_or_create(
+        cart_item = CartItem.objects.filter(
             cart=cart,
-            product_id=product.id,
-            seller_id=seller.id,
-            defaults={
-                'product_name': product.name,
-                'product_price': product.price,
-                'product_stock': product.stock,
-                'store_name': seller.shop_name,
-                'quantity': serializer.validated_data['quantity'],
-            }
-        )
-
-        if not created:
-            cart_item.quantity += serializer.validated_data['quantity']
-            cart_item.save()
+            product_id=serializer.validated_data['product_id'],
+            seller_id=seller.id
+        ).first()
+        quantity = serializer.validated_data['quantity']
+        if cart_item:
+            quantity += cart_item.quantity
+
+        try:
+            product, available = reserve_stock(
+                request.user, serializer.validated_data['product_id'], quantity
+            )
+        except Product.DoesNotExist:
+            raise NotFound("محصول یا فروشنده یافت نشد")
+        except InsufficientStock as e:
+            raise ValidationError({'quantity': str(e)})
+
+        if cart_item:
+            cart_item.quantity = quantity
+            cart_item.product_stock = available
+            cart_item.save(update_fields=['quantity', 'product_stock'])
+        else:
+            cart_item = CartItem.objects.create(
+                cart=cart,
+                product_id=product.id,
+                seller_id=seller.id,
+                product_name=product.name,
+                product_price=product.price,
+                product_stock=available,
+                store_name=seller.shop_name,
+                quantity=quantity
+            )
 
         return Response(CartItemSerializer(cart_item).data, status=status.HTTP_201_CREATED)
 
@@ -64,7 +82,15 @@ class UpdateCartItemView(generics.UpdateAPIView):
         serializer.is_valid(raise_exception=True)
         
         if 'quantity' in serializer.validated_data:
-            pass
+            try:
+                _, available = reserve_stock(
+                    request.user, instance.product_id, serializer.validated_data['quantity']
+                )
+            except Product.DoesNotExist:
+                raise NotFound("محصول یافت نشد")
+            except InsufficientStock as e:
+                raise ValidationError({'quantity': str(e)})
+            instance.product_stock = available
         
         self.perform_update(serializer)
         return Response(serializer.data)
@@ -90,6 +116,10 @@ class RemoveFromCartView(generics.DestroyAPIView):
             raise PermissionDenied("شما اجازه دسترسی به این آیتم را ندارید.")
         return obj
 
+    def perform_destroy(self, instance):
+        release_stock(self.request.user, [instance.product_id])
+        instance.delete()
+
 class ClearCartView(generics.DestroyAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -98,5 +128,6 @@ class ClearCartView(generics.DestroyAPIView):
 
     def destroy(self, request, *args, **kwargs):
         cart = self.get_object()
+        release_stock(request.user, cart.items.values_list('product_id', flat=True))
         cart.items.all().delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
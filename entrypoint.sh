@@ -8,6 +8,7 @@ done
 
 echo "PostgreSQL started"
 
+python manage.py createcachetable
 python manage.py migrate
 python manage.py collectstatic --noinput
 
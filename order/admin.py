@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from .models import Order, OrderItem, OrderSeller
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
@@ -16,6 +16,11 @@ class OrderAdmin(admin.ModelAdmin):
     readonly_fields = ['user', 'total_price', 'created_at', 'updated_at']
     inlines = [OrderItemInline]
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and 'status' in form.changed_data:
+            OrderSeller.objects.filter(order=obj).update(status=obj.status)
+
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
     list_display = ['id', 'order', 'product', 'quantity', 'price', 'seller']
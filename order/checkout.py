@@ -0,0 +1,194 @@
+import logging
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Count, IntegerField, Min, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from products.models import Product
+from products.reservations import InsufficientStock, consume_reservations, live_reservations
+from users.models import Discount
+from .models import CheckoutJob, Order, OrderItem, OrderSeller
+
+logger = logging.getLogger(__name__)
+
+MAX_CHECKOUT_ATTEMPTS = 3
+CHECKOUT_RETRY_DELAY = 10
+
+
+class InvalidCart(Exception):
+    pass
+
+
+def cart_quantities(cart_items):
+    if not cart_items:
+        raise InvalidCart('سبد خرید خالی است')
+
+    quantities = {}
+    try:
+        for item in cart_items:
+            product_id = int(item['product_id'])
+            quantity = int(item['quantity'])
+            if quantity < 1:
+                raise InvalidCart('تعداد باید حداقل ۱ باشد')
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+    except (KeyError, TypeError, ValueError):
+        raise InvalidCart('اقلام سبد خرید نامعتبر است')
+    return quantities
+
+
+def find_discount(discount_code):
+    if not discount_code:
+        return None
+    return Discount.objects.filter(code=discount_code, is_active=True).first()
+
+
+def place_order(user, quantities, discount_code=None, order=None):
+    discount = find_discount(discount_code)
+    consumed = consume_reservations(user, quantities)
+    original_price = sum(
+        consumed[product_id]['price'] * quantity
+        for product_id, quantity in quantities.items()
+    )
+    if discount:
+        total_price = int(original_price * (1 - discount.percentage / 100))
+    else:
+        total_price = original_price
+
+    if order is None:
+        order = Order.objects.create(
+            user=user,
+            discount=discount,
+            original_price=original_price,
+            total_price=total_price
+        )
+    else:
+        order.discount = discount
+        order.original_price = original_price
+        order.total_price = total_price
+        order.status = 'pending'
+        order.save(update_fields=['discount', 'original_price', 'total_price', 'status', 'updated_at'])
+
+    items = OrderItem.objects.bulk_create([
+        OrderItem(
+            order=order,
+            product_id=product_id,
+            quantity=quantity,
+            price=consumed[product_id]['price'],
+            seller_id=consumed[product_id]['seller_id'],
+            product_name=consumed[product_id]['name'],
+            category_name=consumed[product_id]['category_name'],
+            shop_name=consumed[product_id]['shop_name']
+        )
+        for product_id, quantity in quantities.items()
+    ])
+    link_sellers(order, items, {
+        row['seller_id']: row['seller_user_id'] for row in consumed.values()
+    })
+    return order
+
+
+def link_sellers(order, items, seller_users):
+    subtotals = {}
+    for item in items:
+        if item.seller_id:
+            subtotals[item.seller_id] = subtotals.get(item.seller_id, 0) + item.price * item.quantity
+    OrderSeller.objects.bulk_create([
+        OrderSeller(
+            order=order,
+            seller_id=seller_id,
+            seller_user_id=seller_users[seller_id],
+            subtotal=subtotal,
+            status=order.status,
+            created_at=order.created_at
+        )
+        for seller_id, subtotal in subtotals.items()
+    ])
+
+
+def check_availability(user, quantities):
+    reserved = live_reservations().filter(
+        product_id=OuterRef('pk')
+    ).exclude(user=user).values('product_id').annotate(total=Sum('quantity')).values('total')
+    products = Product.objects.filter(id__in=quantities).annotate(
+        reserved=Coalesce(Subquery(reserved), Value(0), output_field=IntegerField())
+    ).values_list('id', 'name', 'stock', 'reserved')
+
+    found = 0
+    for product_id, name, stock, reserved in products:
+        found += 1
+        if quantities[product_id] > stock - reserved:
+            raise InsufficientStock(f"موجودی محصول {name} کافی نیست")
+    if found < len(quantities):
+        raise Product.DoesNotExist
+
+
+def enqueue_checkout(user, quantities, discount_code=None):
+    check_availability(user, quantities)
+    with transaction.atomic():
+        order = Order.objects.create(user=user, status='queued')
+        CheckoutJob.objects.create(
+            order=order,
+            user=user,
+            quantities={str(product_id): quantity for product_id, quantity in quantities.items()},
+            discount_code=discount_code or ''
+        )
+    return order
+
+
+def _finish(job, status, error=''):
+    job.status = status
+    job.error = error
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'attempts', 'finished_at'])
+    if status == 'failed':
+        Order.objects.filter(pk=job.order_id).update(status='failed', updated_at=job.finished_at)
+
+
+def process_next_job():
+    with transaction.atomic():
+        job = CheckoutJob.objects.select_for_update(skip_locked=True, of=('self',)).filter(
+            status='queued', next_attempt_at__lte=timezone.now()
+        ).select_related('order', 'user').order_by('next_attempt_at', 'id').first()
+        if job is None:
+            return None
+
+        job.attempts += 1
+        quantities = {int(product_id): quantity for product_id, quantity in job.quantities.items()}
+        try:
+            with transaction.atomic():
+                place_order(job.user, quantities, job.discount_code, order=job.order)
+        except Product.DoesNotExist:
+            _finish(job, 'failed', 'محصول یافت نشد')
+        except InsufficientStock as e:
+            _finish(job, 'failed', str(e))
+        except Exception as e:
+            logger.exception('Checkout job %s failed', job.pk)
+            if job.attempts >= MAX_CHECKOUT_ATTEMPTS:
+                _finish(job, 'failed', str(e))
+            else:
+                job.next_attempt_at = timezone.now() + timedelta(
+                    seconds=CHECKOUT_RETRY_DELAY * 2 ** (job.attempts - 1)
+                )
+                job.save(update_fields=['attempts', 'next_attempt_at'])
+        else:
+            _finish(job, 'done')
+    return job
+
+
+def queue_stats():
+    now = timezone.now()
+    stats = CheckoutJob.objects.filter(status='queued').aggregate(
+        queued=Count('id'),
+        oldest_queued_at=Min('created_at')
+    )
+    stats.update(CheckoutJob.objects.filter(
+        finished_at__gte=now - timedelta(minutes=5)
+    ).aggregate(
+        done_last_minute=Count('id', filter=Q(status='done', finished_at__gte=now - timedelta(minutes=1))),
+        failed_last_minute=Count('id', filter=Q(status='failed', finished_at__gte=now - timedelta(minutes=1))),
+        finished_last_5_minutes=Count('id')
+    ))
+    oldest = stats.pop('oldest_queued_at')
+    stats['oldest_queued_seconds'] = round((now - oldest).total_seconds(), 1) if oldest else 0
+    stats['throughput_per_minute'] = round(stats.pop('finished_last_5_minutes') / 5, 1)
+    return stats
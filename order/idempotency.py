@@ -0,0 +1,122 @@
+import functools
+import hashlib
+import json
+from datetime import timedelta
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+PRUNE_BATCH_SIZE = 5000
+
+
+def request_fingerprint(scope, request):
+    data = request.data
+    if hasattr(data, 'lists'):
+        data = dict(data.lists())
+    payload = json.dumps(
+        [scope, request.method, request.path, data],
+        sort_keys=True,
+        cls=DjangoJSONEncoder,
+        default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def replay(record):
+    response = Response(record.response_body, status=record.status_code)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def claim_key(user, key, scope, fingerprint):
+    now = timezone.now()
+    record, created = IdempotencyKey.objects.get_or_create(
+        user=user,
+        key=key,
+        defaults={
+            'scope': scope,
+            'fingerprint': fingerprint,
+            'expires_at': now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+        }
+    )
+    if not created and record.expires_at <= now:
+        IdempotencyKey.objects.filter(pk=record.pk, expires_at__lte=now).delete()
+        return claim_key(user, key, scope, fingerprint)
+    if not created and is_abandoned(record, fingerprint, now):
+        reclaimed = IdempotencyKey.objects.filter(
+            pk=record.pk, status_code__isnull=True, created_at=record.created_at
+        ).update(created_at=now, expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL))
+        if reclaimed:
+            record.created_at = now
+            return record, True
+    return record, created
+
+
+def is_abandoned(record, fingerprint, now):
+    return (
+        record.status_code is None
+        and record.fingerprint == fingerprint
+        and record.created_at <= now - timedelta(seconds=settings.IDEMPOTENCY_KEY_LEASE)
+    )
+
+
+def idempotent(scope):
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            request = args[0] if isinstance(args[0], Request) else args[1]
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key or not request.user.is_authenticated:
+                return view(*args, **kwargs)
+            if len(key) > 255:
+                return Response(
+                    {'error': 'کلید یکتایی درخواست بیش از حد طولانی است'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            fingerprint = request_fingerprint(scope, request)
+            record, created = claim_key(request.user, key, scope, fingerprint)
+            if not created:
+                if record.fingerprint != fingerprint:
+                    return Response(
+                        {'error': 'این کلید یکتایی قبلاً برای درخواست دیگری استفاده شده است'},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                    )
+                if record.status_code is None:
+                    return Response(
+                        {'error': 'درخواست قبلی با این کلید هنوز در حال پردازش است'},
+                        status=status.HTTP_409_CONFLICT
+                    )
+                return replay(record)
+
+            try:
+                response = view(*args, **kwargs)
+            except Exception:
+                record.delete()
+                raise
+
+            if response.status_code >= 500 or not hasattr(response, 'data'):
+                record.delete()
+                return response
+            record.status_code = response.status_code
+            record.response_body = response.data
+            record.save(update_fields=['status_code', 'response_body'])
+            return response
+        return wrapper
+    return decorator
+
+
+def prune_expired_keys(batch_size=PRUNE_BATCH_SIZE):
+    pruned = 0
+    while True:
+        ids = list(IdempotencyKey.objects.filter(
+            expires_at__lte=timezone.now()
+        ).order_by('expires_at').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return pruned
+        pruned += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
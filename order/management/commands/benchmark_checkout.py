@@ -0,0 +1,77 @@
+import statistics
+import time
+import uuid
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+from order.views import OrderViewSet
+from products.models import Category, Product, ProductGroup, Subcategory
+from sellers.models import Seller
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Measure checkout latency and query count for carts of different sizes, then roll back'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, nargs='+', default=[1, 10, 100])
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        checkout = OrderViewSet.as_view({'post': 'checkout'})
+        factory = APIRequestFactory()
+        suffix = uuid.uuid4().hex[:8]
+
+        with transaction.atomic():
+            owner = User.objects.create_user(username=f'bench-seller-{suffix}')
+            buyer = User.objects.create_user(username=f'bench-buyer-{suffix}')
+            seller = Seller.objects.create(user=owner, shop_name=f'bench-{suffix}', phone='0', address='-')
+            category = Category.objects.create(name=f'bench-{suffix}')
+            subcategory = Subcategory.objects.create(name=f'bench-{suffix}', category=category)
+            products = Product.objects.bulk_create([
+                Product(
+                    seller=seller,
+                    name=f'bench-{suffix}-{index}',
+                    category=category,
+                    subcategory=subcategory,
+                    price=1000 + index,
+                    stock=options['repeat'] * 10
+                )
+                for index in range(max(options['lines']))
+            ])
+            group_ids = ProductGroup.for_keys({
+                (product.name, category.id, subcategory.id) for product in products
+            })
+            for product in products:
+                product.group_id = group_ids[(product.name, category.id, subcategory.id)]
+            Product.objects.bulk_update(products, ['group'])
+            ProductGroup.refresh(set(group_ids.values()))
+
+            self.stdout.write(f'{"lines":>6} {"queries":>8} {"median ms":>10} {"p95 ms":>8}')
+            for lines in options['lines']:
+                items = [{'product_id': product.id, 'quantity': 1} for product in products[:lines]]
+                timings = []
+                queries = 0
+                for _ in range(options['repeat']):
+                    request = factory.post('/api/orders/checkout/', {'items': items}, format='json')
+                    force_authenticate(request, user=buyer)
+                    with CaptureQueriesContext(connection) as context:
+                        started = time.perf_counter()
+                        response = checkout(request)
+                        timings.append((time.perf_counter() - started) * 1000)
+                    if response.status_code != 201:
+                        self.stderr.write(f'Checkout failed with {response.status_code}: {response.data}')
+                        transaction.set_rollback(True)
+                        return
+                    queries = len(context.captured_queries)
+
+                timings.sort()
+                self.stdout.write(
+                    f'{lines:>6} {queries:>8} {statistics.median(timings):>10.2f} '
+                    f'{timings[int(len(timings) * 0.95) - 1]:>8.2f}'
+                )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,148 @@
+import statistics
+import time
+import uuid
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from order.models import Order, OrderItem, OrderSeller
+from products.models import Category, Product, Subcategory
+from sellers.models import Seller
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the OR/DISTINCT order visibility query with the OrderSeller UNION on '
+        'generated orders, then roll back'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=1000000)
+        parser.add_argument('--buyers', type=int, default=50000)
+        parser.add_argument('--sellers', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--explain', action='store_true')
+
+    def handle(self, *args, **options):
+        suffix = uuid.uuid4().hex[:8]
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            buyers = User.objects.bulk_create([
+                User(username=f'bench-buyer-{suffix}-{index}', password='!')
+                for index in range(options['buyers'])
+            ], batch_size=5000)
+            owners = User.objects.bulk_create([
+                User(username=f'bench-seller-{suffix}-{index}', password='!')
+                for index in range(options['sellers'])
+            ], batch_size=5000)
+            sellers = Seller.objects.bulk_create([
+                Seller(user=owner, shop_name=f'bench-{suffix}-{index}', phone='0', address='-')
+                for index, owner in enumerate(owners)
+            ], batch_size=5000)
+            category = Category.objects.create(name=f'bench-{suffix}')
+            subcategory = Subcategory.objects.create(name=f'bench-{suffix}', category=category)
+            products = Product.objects.bulk_create([
+                Product(
+                    seller=seller,
+                    name=f'bench-{suffix}-{index}',
+                    category=category,
+                    subcategory=subcategory,
+                    price=1000,
+                    stock=0
+                )
+                for index, seller in enumerate(sellers)
+            ], batch_size=5000)
+            self.generate_orders(
+                options['orders'],
+                [buyer.id for buyer in buyers],
+                [product.id for product in products],
+                [seller.id for seller in sellers]
+            )
+            self.stdout.write(
+                f'Generated {options["orders"]} orders in {time.perf_counter() - started:.1f}s'
+            )
+
+            seller_user = owners[0]
+            buyer = buyers[0]
+            self.stdout.write(f'{"user":>8} {"plan":>12} {"median ms":>10} {"p95 ms":>8}')
+            for label, user in (('seller', seller_user), ('buyer', buyer)):
+                plans = {
+                    'or-distinct': Order.objects.filter(
+                        Q(user=user) | Q(items__seller__user=user)
+                    ).distinct(),
+                    'union': Order.visible_to(user),
+                }
+                for name, queryset in plans.items():
+                    page = queryset.order_by('-created_at', '-id')[:20]
+                    timings = []
+                    for _ in range(options['repeat']):
+                        started = time.perf_counter()
+                        list(page.all())
+                        timings.append((time.perf_counter() - started) * 1000)
+                    timings.sort()
+                    self.stdout.write(
+                        f'{label:>8} {name:>12} {statistics.median(timings):>10.2f} '
+                        f'{timings[int(len(timings) * 0.95) - 1]:>8.2f}'
+                    )
+                    if options['explain']:
+                        self.stdout.write(page.explain(analyze=True))
+
+            transaction.set_rollback(True)
+
+    def generate_orders(self, count, buyer_ids, product_ids, seller_ids):
+        order_table = Order._meta.db_table
+        item_table = OrderItem._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM {order_table}')
+            first_id = cursor.fetchone()[0]
+            cursor.execute(
+                f"""
+                INSERT INTO {order_table}
+                    (user_id, created_at, updated_at, status, total_price, original_price)
+                SELECT (%(buyers)s::bigint[])[1 + n %% %(buyer_count)s],
+                    now() - n * interval '1 second', now() - n * interval '1 second',
+                    'completed', 2000, 2000
+                FROM generate_series(%(count)s, 1, -1) AS n
+                """,
+                {'buyers': buyer_ids, 'buyer_count': len(buyer_ids), 'count': count}
+            )
+            for offset in (0, 1):
+                cursor.execute(
+                    f"""
+                    INSERT INTO {item_table}
+                        (order_id, product_id, seller_id, quantity, price,
+                         product_name, category_name, shop_name)
+                    SELECT parent.id,
+                        (%(products)s::bigint[])[1 + (parent.id * 7 + %(offset)s) %% %(seller_count)s],
+                        (%(sellers)s::bigint[])[1 + (parent.id * 7 + %(offset)s) %% %(seller_count)s],
+                        1, 1000, '', '', ''
+                    FROM {order_table} AS parent
+                    WHERE parent.id > %(first_id)s
+                    """,
+                    {
+                        'products': product_ids,
+                        'sellers': seller_ids,
+                        'seller_count': len(seller_ids),
+                        'offset': offset,
+                        'first_id': first_id,
+                    }
+                )
+            cursor.execute(
+                f"""
+                INSERT INTO {OrderSeller._meta.db_table}
+                    (order_id, seller_id, seller_user_id, subtotal, status, created_at)
+                SELECT item.order_id, item.seller_id, seller.user_id,
+                    SUM(item.price * item.quantity), parent.status, parent.created_at
+                FROM {item_table} AS item
+                JOIN {Seller._meta.db_table} AS seller ON seller.id = item.seller_id
+                JOIN {order_table} AS parent ON parent.id = item.order_id
+                WHERE item.order_id > %(first_id)s
+                GROUP BY item.order_id, item.seller_id, seller.user_id, parent.status, parent.created_at
+                """,
+                {'first_id': first_id}
+            )
+            for model in (Order, OrderItem, OrderSeller):
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
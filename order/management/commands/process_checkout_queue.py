@@ -0,0 +1,60 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db import connection
+from order.checkout import process_next_job
+
+
+class Command(BaseCommand):
+    help = 'Place queued checkout orders; workers claim jobs with SKIP LOCKED so several can run side by side'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--idle-sleep', type=float, default=1.0)
+        parser.add_argument('--report-every', type=float, default=60.0)
+        parser.add_argument('--once', action='store_true', help='Drain the queue and exit')
+
+    def handle(self, *args, **options):
+        self.processed = 0
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = [
+                executor.submit(self.work, options['idle_sleep'], options['once'])
+                for _ in range(options['workers'])
+            ]
+            try:
+                while not all(future.done() for future in futures):
+                    time.sleep(min(options['report_every'], 1.0) if options['once'] else options['report_every'])
+                    if not options['once']:
+                        self.report(started)
+            except KeyboardInterrupt:
+                self.stop.set()
+            for future in futures:
+                future.result()
+
+        self.report(started)
+
+    def work(self, idle_sleep, once):
+        try:
+            while not self.stop.is_set():
+                job = process_next_job()
+                if job is None:
+                    if once:
+                        return
+                    self.stop.wait(idle_sleep)
+                    continue
+                with self.lock:
+                    self.processed += 1
+        finally:
+            connection.close()
+
+    def report(self, started):
+        elapsed = time.monotonic() - started
+        with self.lock:
+            processed = self.processed
+        rate = processed / elapsed * 60 if elapsed else 0
+        self.stdout.write(f'{processed} checkout jobs processed in {elapsed:.1f}s ({rate:.0f}/min)')
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from order.idempotency import PRUNE_BATCH_SIZE, prune_expired_keys
+
+
+class Command(BaseCommand):
+    help = 'Delete idempotency keys whose replay window has expired'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=PRUNE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        pruned = prune_expired_keys(options['batch_size'])
+        self.stdout.write(f'{pruned} idempotency keys pruned')
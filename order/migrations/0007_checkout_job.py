@@ -0,0 +1,41 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0006_idempotency_keys'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='status',
+            field=models.CharField(choices=[('queued', 'در صف ثبت'), ('pending', 'در حال پردازش'), ('completed', 'تحویل شده'), ('cancelled', 'لغو شده'), ('failed', 'ناموفق')], default='pending', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='CheckoutJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantities', models.JSONField()),
+                ('discount_code', models.CharField(blank=True, max_length=50)),
+                ('status', models.CharField(choices=[('queued', 'در صف'), ('done', 'انجام شده'), ('failed', 'ناموفق')], default='queued', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='checkout_job', to='order.order')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkout_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'کار ثبت سفارش',
+                'verbose_name_plural': 'کارهای ثبت سفارش',
+                'indexes': [models.Index(condition=models.Q(('status', 'queued')), fields=['id'], name='checkout_job_queue_idx'), models.Index(fields=['finished_at'], name='order_check_finishe_39000f_idx')],
+            },
+        ),
+    ]
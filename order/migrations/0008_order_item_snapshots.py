@@ -0,0 +1,51 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:35
+
+from django.db import migrations, models
+
+
+def snapshot_order_items(apps, schema_editor):
+    OrderItem = apps.get_model('order', 'OrderItem')
+    Product = apps.get_model('products', 'Product')
+    Category = apps.get_model('products', 'Category')
+    Seller = apps.get_model('sellers', 'Seller')
+    schema_editor.execute(
+        f"""
+        UPDATE {OrderItem._meta.db_table} AS item
+        SET product_name = product.name,
+            category_name = COALESCE(category.name, ''),
+            shop_name = seller.shop_name
+        FROM {Product._meta.db_table} AS product
+        LEFT JOIN {Category._meta.db_table} AS category ON category.id = product.category_id,
+            {Seller._meta.db_table} AS seller
+        WHERE product.id = item.product_id
+            AND seller.id = COALESCE(item.seller_id, product.seller_id)
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0007_checkout_job'),
+        ('products', '0015_price_history'),
+        ('sellers', '0004_seller_logo_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='category_name',
+            field=models.CharField(blank=True, default='', max_length=255, verbose_name='دسته\u200cبندی'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='product_name',
+            field=models.CharField(blank=True, default='', max_length=255, verbose_name='نام محصول'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='shop_name',
+            field=models.CharField(blank=True, default='', max_length=255, verbose_name='نام فروشگاه'),
+        ),
+        migrations.RunPython(snapshot_order_items, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:37
+
+from django.db import migrations, models
+
+
+def copy_order_created_at(apps, schema_editor):
+    Order = apps.get_model('order', 'Order')
+    OrderItem = apps.get_model('order', 'OrderItem')
+    schema_editor.execute(
+        f"""
+        UPDATE {OrderItem._meta.db_table} AS item
+        SET order_created_at = parent.created_at
+        FROM {Order._meta.db_table} AS parent
+        WHERE parent.id = item.order_id
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0008_order_item_snapshots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='order_created_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(copy_order_created_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['seller', 'order_created_at', 'order'], name='order_item_seller_inbox_idx'),
+        ),
+    ]
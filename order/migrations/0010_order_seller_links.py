@@ -0,0 +1,53 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def link_existing_orders(apps, schema_editor):
+    Order = apps.get_model('order', 'Order')
+    OrderItem = apps.get_model('order', 'OrderItem')
+    OrderSeller = apps.get_model('order', 'OrderSeller')
+    Seller = apps.get_model('sellers', 'Seller')
+    schema_editor.execute(
+        f"""
+        INSERT INTO {OrderSeller._meta.db_table}
+            (order_id, seller_id, seller_user_id, subtotal, status, created_at)
+        SELECT item.order_id, item.seller_id, seller.user_id,
+            SUM(item.price * item.quantity), parent.status, parent.created_at
+        FROM {OrderItem._meta.db_table} AS item
+        JOIN {Seller._meta.db_table} AS seller ON seller.id = item.seller_id
+        JOIN {Order._meta.db_table} AS parent ON parent.id = item.order_id
+        GROUP BY item.order_id, item.seller_id, seller.user_id, parent.status, parent.created_at
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0009_seller_inbox_index'),
+        ('sellers', '0004_seller_logo_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderSeller',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subtotal', models.IntegerField(default=0)),
+                ('status', models.CharField(choices=[('queued', 'در صف ثبت'), ('pending', 'در حال پردازش'), ('completed', 'تحویل شده'), ('cancelled', 'لغو شده'), ('failed', 'ناموفق')], default='pending', max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seller_links', to='order.order')),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_links', to='sellers.seller')),
+                ('seller_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seller_order_links', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['seller_user', 'order'], name='order_seller_user_idx'), models.Index(fields=['seller', 'created_at'], name='order_seller_inbox_idx')],
+                'constraints': [models.UniqueConstraint(fields=('order', 'seller'), name='order_seller_unique')],
+            },
+        ),
+        migrations.RunPython(link_existing_orders, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:04
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0010_order_seller_links'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='checkoutjob',
+            name='checkout_job_queue_idx',
+        ),
+        migrations.AddField(
+            model_name='checkoutjob',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='checkoutjob',
+            index=models.Index(condition=models.Q(('status', 'queued')), fields=['next_attempt_at', 'id'], name='checkout_job_due_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0011_checkout_job_backoff'),
+        ('sellers', '0004_seller_logo_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='orderitem',
+            name='order_item_seller_inbox_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='orderseller',
+            name='order_seller_inbox_idx',
+        ),
+        migrations.RemoveField(
+            model_name='orderitem',
+            name='order_created_at',
+        ),
+        migrations.AddIndex(
+            model_name='orderseller',
+            index=models.Index(fields=['seller', 'created_at', 'order'], name='order_seller_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderseller',
+            index=models.Index(fields=['seller', 'status', 'created_at', 'order'], name='order_seller_status_idx'),
+        ),
+    ]
@@ -1,14 +1,18 @@
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from products.models import Product
 
 User = get_user_model()
 
 class Order(models.Model):
     STATUS_CHOICES = [
+        ('queued', 'در صف ثبت'),
         ('pending', 'در حال پردازش'),
         ('completed', 'تحویل شده'),
         ('cancelled', 'لغو شده'),
+        ('failed', 'ناموفق'),
     ]
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='orders')
@@ -44,12 +48,23 @@ class Order(models.Model):
     def __str__(self):
         return f"سفارش {self.id} - {self.user.username}"
 
+    @classmethod
+    def visible_to(cls, user):
+        order_ids = cls.objects.filter(user=user).values('id').union(
+            OrderSeller.objects.filter(seller_user=user).values('order_id'),
+            all=True
+        )
+        return cls.objects.filter(id__in=order_ids)
+
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items', verbose_name='سفارش')
     product = models.ForeignKey(Product, on_delete=models.PROTECT, verbose_name='محصول')
     seller = models.ForeignKey('sellers.Seller', on_delete=models.PROTECT, null=True, blank=True, verbose_name='فروشنده')
     quantity = models.PositiveIntegerField(verbose_name='تعداد')
     price = models.IntegerField(verbose_name='قیمت')
+    product_name = models.CharField(max_length=255, blank=True, default='', verbose_name='نام محصول')
+    category_name = models.CharField(max_length=255, blank=True, default='', verbose_name='دسته‌بندی')
+    shop_name = models.CharField(max_length=255, blank=True, default='', verbose_name='نام فروشگاه')
     
     class Meta:
         unique_together = ['order', 'product', 'seller']
@@ -57,4 +72,79 @@ class OrderItem(models.Model):
         verbose_name_plural = 'آیتم‌های سفارش'
     
     def __str__(self):
-        return f"{self.product.name} ({self.quantity}) - {self.order}"
\ No newline at end of file
+        return f"{self.product_name or self.product.name} ({self.quantity}) - {self.order}"
+
+class OrderSeller(models.Model):
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='seller_links')
+    seller = models.ForeignKey('sellers.Seller', on_delete=models.CASCADE, related_name='order_links')
+    seller_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='seller_order_links')
+    subtotal = models.IntegerField(default=0)
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES, default='pending')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['order', 'seller'], name='order_seller_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['seller_user', 'order'], name='order_seller_user_idx'),
+            models.Index(fields=['seller', 'created_at', 'order'], name='order_seller_inbox_idx'),
+            models.Index(fields=['seller', 'status', 'created_at', 'order'], name='order_seller_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.order_id} - {self.seller_id}"
+
+class CheckoutJob(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'در صف'),
+        ('done', 'انجام شده'),
+        ('failed', 'ناموفق'),
+    ]
+
+    order = models.OneToOneField(Order, on_delete=models.CASCADE, related_name='checkout_job')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='checkout_jobs')
+    quantities = models.JSONField()
+    discount_code = models.CharField(max_length=50, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'کار ثبت سفارش'
+        verbose_name_plural = 'کارهای ثبت سفارش'
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at', 'id'],
+                condition=models.Q(status='queued'),
+                name='checkout_job_due_idx'
+            ),
+            models.Index(fields=['finished_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.order} - {self.status}"
+
+
+class IdempotencyKey(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    scope = models.CharField(max_length=100)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = 'کلید یکتایی درخواست'
+        verbose_name_plural = 'کلیدهای یکتایی درخواست'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_user_idempotency_key')
+        ]
+
+    def __str__(self):
+        return f"{self.scope} - {self.key}"
@@ -1,30 +1,46 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import Order, OrderItem
+from django.db.models import prefetch_related_objects
+from django.db.models.manager import BaseManager
 from sellers.models import Seller
 from products.serializers import ProductSerializer
+from backend.serializers import DynamicFieldsMixin
 
 User = get_user_model()
 
-class SellerSerializer(serializers.ModelSerializer):
+class SellerSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Seller
         fields = ['id', 'shop_name', 'phone']
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email']
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    product_id = serializers.IntegerField(read_only=True)
+    seller_id = serializers.IntegerField(read_only=True)
     product = ProductSerializer(read_only=True)
     seller = SellerSerializer(read_only=True)
 
     class Meta:
         model = OrderItem
-        fields = ['id', 'product', 'quantity', 'price', 'seller']
+        fields = ['id', 'product_id', 'product_name', 'category_name', 'seller_id', 'shop_name',
+                 'quantity', 'price', 'product', 'seller']
+        expandable_fields = ['product', 'seller']
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, BaseManager) else data
+        orders = list(iterable)
+        self.child.prefetch_items(orders)
+        return [self.child.to_representation(item) for item in orders]
+
+
+class OrderSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    expand_by_default = False
     user = UserSerializer(read_only=True)
     items = OrderItemSerializer(many=True, read_only=True)
     discount_percentage = serializers.SerializerMethodField()
@@ -34,6 +50,32 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = ['id', 'user', 'items', 'total_price', 'original_price', 
                  'status', 'created_at', 'discount', 'discount_percentage', 'discount_code']
+        read_only_fields = ['status']
+        list_serializer_class = OrderListSerializer
+
+    def prefetch_items(self, orders):
+        lookups = []
+        if 'user' in self.fields:
+            lookups.append('user')
+        if 'discount_percentage' in self.fields or 'discount_code' in self.fields:
+            lookups.append('discount')
+        item_fields = self.fields['items'].child.fields if 'items' in self.fields else {}
+        if 'items' in self.fields:
+            lookups.append('items')
+        if 'product' in item_fields:
+            lookups.append('items__product')
+        if 'seller' in item_fields:
+            lookups.append('items__seller')
+        prefetch_related_objects(orders, *lookups)
+
+        if 'product' in item_fields:
+            products = [item.product for order in orders for item in order.items.all()]
+            item_fields['product'].prefetch_offers(products)
+
+    def to_representation(self, instance):
+        if not isinstance(self.parent, serializers.ListSerializer):
+            self.prefetch_items([instance])
+        return super().to_representation(instance)
 
     def get_discount_percentage(self, obj):
         return obj.discount.percentage if obj.discount else None
@@ -1,149 +1,203 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
-from .models import Order, OrderItem
+from .models import CheckoutJob, Order, OrderItem, OrderSeller
 from sellers.models import Seller
 from .serializers import OrderSerializer
-from users.models import Discount
+from .idempotency import idempotent
+from .checkout import InvalidCart, cart_quantities, enqueue_checkout, place_order, queue_stats
 from django.db import transaction
 from products.models import Product
-from django.db import models
+from products.pagination import KeysetCursorPagination
+from products.reservations import InsufficientStock
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import datetime, time, timedelta
+
+class OrderCursorPagination(CursorPagination):
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+def order_read_queryset(queryset):
+    return queryset.select_related('discount', 'user').prefetch_related('items')
+
 
 class UserOrdersView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-        orders = Order.objects.filter(user=user)
-        serializer = OrderSerializer(orders, many=True)
-        return Response(serializer.data)
+        orders = order_read_queryset(Order.objects.filter(user=request.user))
+        paginator = OrderCursorPagination()
+        page = paginator.paginate_queryset(orders, request, view=self)
+        serializer = OrderSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
+class SellerInboxCursorPagination(KeysetCursorPagination):
+    ordering = ('-created_at', '-order_id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
 
 class SellerOrdersView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         seller = get_object_or_404(Seller, user=request.user)
-        order_items = OrderItem.objects.filter(seller=seller).select_related(
-            'order', 'order__user', 'product'
-        ).order_by('-order__created_at')
-        
-        orders = {}
-        for item in order_items:
-            order_id = item.order.id
-            if order_id not in orders:
-                orders[order_id] = {
-                    'order_id': order_id,
-                    'customer': {
-                        'id': item.order.user.id,
-                        'username': item.order.user.username,
-                        'email': item.order.user.email,
-                        'phone' : item.order.user.phone
-                    },
-                    'status': item.order.status,
-                    'created_at': item.order.created_at,
-                    'total_price': item.order.total_price,
-                    'items': []
-                }
-            orders[order_id]['items'].append({
-                'product_id': item.product.id,
-                'product_name': item.product.name,
-                'quantity': item.quantity,
-                'price': item.price,
-                'total_price': item.price * item.quantity
+        params = request.query_params
+        links = OrderSeller.objects.filter(seller=seller)
+
+        order_status = params.get('status')
+        if order_status:
+            valid_statuses = [choice for choice, _ in Order.STATUS_CHOICES]
+            if order_status not in valid_statuses:
+                return Response(
+                    {'error': f'وضعیت نامعتبر است. مقادیر مجاز: {", ".join(valid_statuses)}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            links = links.filter(status=order_status)
+
+        try:
+            start = parse_date(params['from']) if 'from' in params else None
+            end = parse_date(params['to']) if 'to' in params else None
+        except ValueError:
+            start = end = None
+        if ('from' in params and start is None) or ('to' in params and end is None) or (
+            start and end and start > end
+        ):
+            return Response({'error': 'بازه تاریخ نامعتبر است'}, status=status.HTTP_400_BAD_REQUEST)
+        tz = timezone.get_current_timezone()
+        if start:
+            links = links.filter(created_at__gte=datetime.combine(start, time.min, tzinfo=tz))
+        if end:
+            links = links.filter(created_at__lt=datetime.combine(end + timedelta(days=1), time.min, tzinfo=tz))
+
+        paginator = SellerInboxCursorPagination()
+        page = paginator.paginate_queryset(links.select_related('order__user').only(
+            'order_id', 'created_at', 'subtotal', 'status',
+            'order__total_price',
+            'order__user__id', 'order__user__username', 'order__user__email', 'order__user__phone'
+        ), request, view=self)
+
+        order_ids = [link.order_id for link in page]
+        items = {}
+        for item in OrderItem.objects.filter(seller=seller, order_id__in=order_ids).order_by('id').values(
+            'order_id', 'product_id', 'product_name', 'quantity', 'price'
+        ):
+            order_id = item.pop('order_id')
+            item['total_price'] = item['price'] * item['quantity']
+            items.setdefault(order_id, []).append(item)
+
+        results = []
+        for link in page:
+            customer = link.order.user
+            order_items = items.get(link.order_id, [])
+            results.append({
+                'order_id': link.order_id,
+                'customer': {
+                    'id': customer.id,
+                    'username': customer.username,
+                    'email': customer.email,
+                    'phone': customer.phone
+                },
+                'status': link.status,
+                'created_at': link.created_at,
+                'total_price': link.order.total_price,
+                'seller_subtotal': link.subtotal,
+                'items_count': len(order_items),
+                'items': order_items
             })
-        
-        return Response(list(orders.values()))
+        return paginator.get_paginated_response(results)
 
 class OrderViewSet(viewsets.ModelViewSet):
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = OrderCursorPagination
 
     def get_queryset(self):
-        return Order.objects.filter(
-            models.Q(user=self.request.user) |
-            models.Q(items__seller__user=self.request.user)
-        ).distinct()
+        return order_read_queryset(Order.visible_to(self.request.user))
         
         
     @action(detail=False, methods=['post'])
+    @idempotent('order-checkout')
     def checkout(self, request):
-        cart_items = request.data.get('items', [])
+        try:
+            quantities = cart_quantities(request.data.get('items', []))
+        except InvalidCart as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         discount_code = request.data.get('discount_code')
 
-        if not cart_items:
-            return Response({'error': 'سبد خرید خالی است'}, status=status.HTTP_400_BAD_REQUEST)
+        if request.data.get('mode') == 'async':
+            try:
+                order = enqueue_checkout(request.user, quantities, discount_code)
+            except Product.DoesNotExist:
+                return Response({'error': 'محصول یافت نشد'}, status=404)
+            except InsufficientStock as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({
+                'order_id': order.id,
+                'status': order.status,
+                'status_url': request.build_absolute_uri(f'/api/orders/{order.id}/checkout-status/')
+            }, status=status.HTTP_202_ACCEPTED)
 
         try:
             with transaction.atomic():
-                discount = None
-                if discount_code:
-                    try:
-                        discount = Discount.objects.get(code=discount_code, is_active=True)
-                    except Discount.DoesNotExist:
-                        pass
-
-                order = Order.objects.create(
-                    user=request.user,
-                    discount=discount
-                )
-                total_price = 0
-
-                for item in cart_items:
-                    product = Product.objects.get(pk=item['product_id'])
-
-                    if product.stock < item['quantity']:
-                        raise Exception(f"موجودی محصول {product.name} کافی نیست")
-
-                    OrderItem.objects.create(
-                        order=order,
-                        product=product,
-                        quantity=item['quantity'],
-                        price=product.price,
-                        seller=product.seller
-                    )
-
-                    product.stock -= item['quantity']
-                    product.save()
-
-                    total_price += product.price * item['quantity']
-
-                order.original_price = total_price
-                if discount:
-                    order.total_price = int(total_price * (1 - discount.percentage / 100))
-                else:
-                    order.total_price = total_price
-                order.save()
-
+                order = place_order(request.user, quantities, discount_code)
                 serializer = self.get_serializer(order)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         except Product.DoesNotExist:
             return Response({'error': 'محصول یافت نشد'}, status=404)
+        except InsufficientStock as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({'error': str(e)}, status=500)
 
+    @action(detail=True, methods=['get'], url_path='checkout-status')
+    def checkout_status(self, request, pk=None):
+        job = CheckoutJob.objects.filter(
+            order_id=pk, user=request.user
+        ).values('order_id', 'order__status', 'status', 'error', 'finished_at').first()
+        if job is None:
+            return Response({'error': 'سفارش یافت نشد یا دسترسی ندارید'}, status=404)
+        return Response({
+            'order_id': job['order_id'],
+            'order_status': job['order__status'],
+            'job_status': job['status'],
+            'error': job['error'] or None,
+            'finished_at': job['finished_at'],
+        })
+
+    @action(detail=False, methods=['get'], url_path='queue-stats', permission_classes=[IsAdminUser])
+    def checkout_queue_stats(self, request):
+        return Response(queue_stats())
 
     @action(detail=True, methods=['patch'], url_path='update-status')
+    @idempotent('order-update-status')
     def update_status(self, request, pk=None):
         try:
-            order = Order.objects.get(
-                models.Q(pk=pk) & (
-                    models.Q(user=self.request.user) |
-                    models.Q(items__seller__user=self.request.user)
-                )
-            )
+            order = Order.visible_to(self.request.user).get(pk=pk)
         except Order.DoesNotExist:
             return Response({'error': 'سفارش یافت نشد یا دسترسی ندارید'}, status=404)
 
+        if order.status in ('queued', 'failed'):
+            return Response({'error': 'وضعیت سفارش در صف یا ناموفق قابل تغییر نیست'}, status=400)
+
         new_status = request.data.get('status')
         valid_statuses = ['pending', 'completed', 'cancelled']
         
         if new_status not in valid_statuses:
             return Response({'error': f'وضعیت نامعتبر است. مقادیر مجاز: {", ".join(valid_statuses)}'}, status=400)
 
-        order.status = new_status
-        order.save()
+        with transaction.atomic():
+            order.status = new_status
+            order.save()
+            OrderSeller.objects.filter(order=order).update(status=new_status)
         return Response({'success': f'وضعیت سفارش به {new_status} تغییر یافت'})
\ No newline at end of file
@@ -1,12 +1,25 @@
 from django.contrib import admin
-from .models import Product, Category, Subcategory,ProductComment
+from .models import Product, Category, Subcategory,ProductComment, ProductGroup, StockReservation
+from .moderation import approve_comments, reject_comments
 
 @admin.register(ProductComment)
 class ProductCommentAdmin(admin.ModelAdmin):
-    list_display = ['id', 'product', 'user', 'created_at']
-    list_filter = ['product', 'user']
+    list_display = ['id', 'product', 'user', 'rating', 'is_approved', 'created_at']
+    list_filter = ['is_approved', 'rating']
     search_fields = ['text', 'user__username', 'product__name']
     list_select_related = ['product', 'user']
+    raw_id_fields = ['product', 'user']
+    actions = ['approve_selected', 'reject_selected']
+
+    @admin.action(description='تأیید نظرات انتخاب‌شده')
+    def approve_selected(self, request, queryset):
+        result = approve_comments(queryset.values_list('id', flat=True))
+        self.message_user(request, f"{len(result['approved'])} نظر تأیید شد، {len(result['skipped'])} نظر نادیده گرفته شد")
+
+    @admin.action(description='رد نظرات در انتظار انتخاب‌شده')
+    def reject_selected(self, request, queryset):
+        result = reject_comments(queryset.values_list('id', flat=True))
+        self.message_user(request, f"{len(result['rejected'])} نظر حذف شد")
 
 
 @admin.register(Category)
@@ -39,4 +52,21 @@ class ProductAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         return super().get_queryset(request).select_related(
             'category', 'subcategory', 'seller', 'seller__user'
-        )
\ No newline at end of file
+        )
+
+@admin.register(ProductGroup)
+class ProductGroupAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'category', 'subcategory', 'sellers_count', 'min_price', 'max_price', 'total_stock']
+    list_filter = ['category', 'subcategory']
+    search_fields = ['name']
+    list_select_related = ['category', 'subcategory']
+    readonly_fields = ['representative', 'sellers_count', 'min_price', 'max_price', 'total_stock', 'updated_at']
+    ordering = ['name']
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ['id', 'product', 'user', 'quantity', 'expires_at']
+    search_fields = ['product__name', 'user__username']
+    list_select_related = ['product', 'user']
+    raw_id_fields = ['product', 'user']
+    ordering = ['expires_at']
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+@register(Tags.caches, deploy=False)
+def check_version_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if settings.DEBUG or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Error(
+            f"The default cache backend {backend} is local to one process.",
+            hint=(
+                "Catalog version stamps behind ETags, the response cache and the taxonomy cache "
+                "are bumped by every worker and by management commands, so they must live in a "
+                "shared cache. Set CACHE_BACKEND to a shared backend, e.g. the default "
+                "backend.cache.DatabaseCache with CACHE_LOCATION=cache_table, "
+                "or django.core.cache.backends.redis.RedisCache."
+            ),
+            id='products.E001',
+        )
+    ]
@@ -0,0 +1,31 @@
+import hashlib
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from .response_cache import cached_response, is_cacheable
+from .versions import get_versions
+
+
+def make_etag(request, versions, key=''):
+    payload = '|'.join([
+        request.get_full_path(),
+        str(key),
+        *(f'{scope}={versions[scope]}' for scope in sorted(versions))
+    ])
+    return '"%s"' % hashlib.sha1(payload.encode()).hexdigest()
+
+
+def conditional_response(request, scopes, render, key='', view=None):
+    versions = get_versions(scopes)
+    etag = make_etag(request, versions, key)
+    last_modified = max(versions.values()) // 10 ** 9
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None and view is not None and is_cacheable(request):
+        response = cached_response(view, request, etag, render)
+    elif response is None:
+        response = render()
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ['Authorization'])
+    return response
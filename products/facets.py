@@ -0,0 +1,115 @@
+import hashlib
+from django.core.exceptions import EmptyResultSet
+from django.db import connection
+from django.db.models import F, Func, IntegerField, Value
+from django.contrib.postgres.fields import ArrayField
+from .response_cache import response_cache
+from .taxonomy import taxonomy_cache
+from .versions import CATALOG_SCOPE, TAXONOMY_SCOPE, get_versions
+
+PRICE_BUCKETS = (0, 100000, 500000, 1000000, 5000000, 10000000, 50000000)
+
+CATEGORY_SET = 0b011
+SUBCATEGORY_SET = 0b001
+PRICE_SET = 0b110
+TOTAL_SET = 0b111
+
+
+def facet_cache_key(filters):
+    versions = get_versions([CATALOG_SCOPE, TAXONOMY_SCOPE])
+    payload = '|'.join([
+        *(f'{name}={filters[name]}' for name in sorted(filters) if filters[name] not in (None, '')),
+        *(f'{scope}={versions[scope]}' for scope in sorted(versions)),
+    ])
+    return 'products:facets:%s' % hashlib.sha1(payload.encode()).hexdigest()
+
+
+def get_facets(groups, filters):
+    cache = response_cache()
+    key = facet_cache_key(filters)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(groups)
+        cache.set(key, facets)
+    return facets
+
+
+def compute_facets(groups):
+    facets = {
+        'total': 0,
+        'in_stock': 0,
+        'min_price': None,
+        'max_price': None,
+        'categories': [],
+        'price_ranges': [],
+    }
+    bucketed = groups.annotate(
+        price_bucket=Func(
+            F('min_price'),
+            Value(list(PRICE_BUCKETS), output_field=ArrayField(IntegerField())),
+            function='width_bucket',
+            output_field=IntegerField()
+        )
+    ).values('category_id', 'subcategory_id', 'price_bucket', 'min_price', 'max_price', 'total_stock')
+    try:
+        sql, params = bucketed.query.sql_with_params()
+    except EmptyResultSet:
+        return facets
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT GROUPING(category_id, subcategory_id, price_bucket),
+                category_id, subcategory_id, price_bucket,
+                COUNT(*), COUNT(*) FILTER (WHERE total_stock > 0),
+                MIN(min_price), MAX(max_price)
+            FROM ({sql}) AS facet_groups
+            GROUP BY GROUPING SETS (
+                (category_id), (category_id, subcategory_id), (price_bucket), ()
+            )
+            """,
+            params
+        )
+        rows = cursor.fetchall()
+
+    categories = {}
+    subcategories = []
+    for grouping, category_id, subcategory_id, bucket, count, in_stock, low, high in rows:
+        if grouping == TOTAL_SET:
+            facets.update(total=count, in_stock=in_stock, min_price=low, max_price=high)
+        elif grouping == PRICE_SET:
+            upper = PRICE_BUCKETS[bucket] if bucket < len(PRICE_BUCKETS) else None
+            facets['price_ranges'].append({
+                'min': PRICE_BUCKETS[bucket - 1],
+                'max': upper,
+                'count': count,
+                'in_stock': in_stock,
+            })
+        elif grouping == CATEGORY_SET and category_id is not None:
+            category = taxonomy_cache.category(category_id)
+            if category is not None:
+                categories[category_id] = {
+                    'id': category.id,
+                    'name': category.name,
+                    'slug': category.slug,
+                    'count': count,
+                    'in_stock': in_stock,
+                    'subcategories': [],
+                }
+        elif grouping == SUBCATEGORY_SET and subcategory_id is not None:
+            subcategory = taxonomy_cache.subcategory(subcategory_id)
+            if subcategory is not None:
+                subcategories.append((category_id, {
+                    'id': subcategory.id,
+                    'name': subcategory.name,
+                    'slug': subcategory.slug,
+                    'count': count,
+                    'in_stock': in_stock,
+                }))
+
+    for category_id, subcategory in sorted(subcategories, key=lambda item: item[1]['name']):
+        if category_id in categories:
+            categories[category_id]['subcategories'].append(subcategory)
+    facets['categories'] = sorted(categories.values(), key=lambda category: category['name'])
+    facets['price_ranges'].sort(key=lambda price_range: price_range['min'])
+    return facets
@@ -0,0 +1,53 @@
+import django_filters
+from .models import Product, ProductGroup
+from .taxonomy import taxonomy_cache
+
+class ProductFilter(django_filters.FilterSet):
+    min_price = django_filters.NumberFilter(field_name='price', lookup_expr='gte')
+    max_price = django_filters.NumberFilter(field_name='price', lookup_expr='lte')
+    in_stock = django_filters.BooleanFilter(method='filter_in_stock')
+
+    class Meta:
+        model = Product
+        fields = []
+
+    def filter_in_stock(self, queryset, name, value):
+        if value:
+            return queryset.filter(stock__gt=0)
+        if value is False:
+            return queryset.filter(stock=0)
+        return queryset
+
+
+class ProductGroupFilter(django_filters.FilterSet):
+    category = django_filters.CharFilter(method='filter_category')
+    subcategory = django_filters.CharFilter(method='filter_subcategory')
+    min_price = django_filters.NumberFilter(field_name='min_price', lookup_expr='gte')
+    max_price = django_filters.NumberFilter(field_name='min_price', lookup_expr='lte')
+    in_stock = django_filters.BooleanFilter(method='filter_in_stock')
+
+    class Meta:
+        model = ProductGroup
+        fields = []
+
+    def filter_category(self, queryset, name, value):
+        category = taxonomy_cache.category_by_slug(value) or taxonomy_cache.category_by_name(value)
+        if category is None:
+            return queryset.none()
+        return queryset.filter(category=category)
+
+    def filter_subcategory(self, queryset, name, value):
+        subcategory = (
+            taxonomy_cache.subcategory_by_slug(value)
+            or taxonomy_cache.subcategory_by_name(value)
+        )
+        if subcategory is None:
+            return queryset.none()
+        return queryset.filter(subcategory=subcategory)
+
+    def filter_in_stock(self, queryset, name, value):
+        if value:
+            return queryset.filter(total_stock__gt=0)
+        if value is False:
+            return queryset.filter(total_stock=0)
+        return queryset
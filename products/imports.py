@@ -0,0 +1,166 @@
+import csv
+import json
+from django.db import transaction
+from .models import Product, ProductGroup
+from .price_history import record_prices
+from .taxonomy import taxonomy_cache
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+IMPORT_CHUNK_SIZE = 1000
+MAX_POSITIVE_INTEGER = 2147483647
+
+
+class ImportFileError(Exception):
+    def __init__(self, row, message):
+        super().__init__(message)
+        self.row = row
+
+
+def decode_lines(upload):
+    for line_number, line in enumerate(upload.file, start=1):
+        try:
+            yield line.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise ImportFileError(line_number, 'فایل باید با کدگذاری UTF-8 ذخیره شده باشد')
+
+
+def read_rows(upload, file_format):
+    lines = decode_lines(upload)
+    if file_format == 'csv':
+        reader = csv.DictReader(lines)
+        try:
+            for row in reader:
+                yield reader.line_num, row
+        except csv.Error:
+            raise ImportFileError(reader.line_num, 'ساختار فایل CSV نامعتبر است')
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row
+
+
+def clean_row(row):
+    if not isinstance(row, dict):
+        return None, {'row': 'ردیف نامعتبر است'}
+
+    data = {}
+    errors = {}
+    for field in ('name', 'category', 'subcategory'):
+        value = str(row.get(field) or '').strip()
+        if not value:
+            errors[field] = 'این فیلد الزامی است'
+        elif len(value) > 255:
+            errors[field] = 'حداکثر ۲۵۵ کاراکتر مجاز است'
+        data[field] = value
+
+    for field in ('price', 'stock'):
+        try:
+            value = int(str(row.get(field, '')).strip())
+            if not 0 <= value <= MAX_POSITIVE_INTEGER:
+                raise ValueError
+        except (TypeError, ValueError):
+            errors[field] = 'یک عدد صحیح نامنفی وارد کنید'
+            value = None
+        data[field] = value
+
+    return data, errors
+
+
+class ProductImporter:
+    def __init__(self, seller):
+        self.seller = seller
+        self.categories = {}
+        self.subcategories = {}
+        self.imported = 0
+        self.errors = []
+
+    def get_category(self, name):
+        if name not in self.categories:
+            self.categories[name] = taxonomy_cache.get_or_create_category(name)
+        return self.categories[name]
+
+    def get_subcategory(self, name, category):
+        key = (category.id, name)
+        if key not in self.subcategories:
+            self.subcategories[key] = taxonomy_cache.get_or_create_subcategory(name, category)
+        return self.subcategories[key]
+
+    def run(self, upload, file_format):
+        chunk = []
+        try:
+            for line_number, row in read_rows(upload, file_format):
+                data, errors = clean_row(row)
+                if errors:
+                    self.errors.append({'row': line_number, 'errors': errors})
+                    continue
+
+                chunk.append((line_number, data))
+                if len(chunk) >= IMPORT_CHUNK_SIZE:
+                    self.flush(chunk)
+                    chunk = []
+        except ImportFileError as error:
+            self.errors.append({'row': error.row, 'errors': {'file': str(error)}})
+
+        if chunk:
+            self.flush(chunk)
+
+        return {
+            'imported': self.imported,
+            'failed': len(self.errors),
+            'errors': sorted(self.errors, key=lambda error: error['row']),
+        }
+
+    def flush(self, chunk):
+        products = {}
+        rows = {}
+        for line_number, data in chunk:
+            category = self.get_category(data['category'])
+            subcategory = self.get_subcategory(data['subcategory'], category)
+            key = (data['name'], category.id, subcategory.id)
+            if key in products:
+                self.errors.append({
+                    'row': line_number,
+                    'errors': {'row': f'این محصول در ردیف {rows[key]} تکرار شده است'}
+                })
+                continue
+            rows[key] = line_number
+            products[key] = Product(
+                seller=self.seller,
+                name=data['name'],
+                category=category,
+                subcategory=subcategory,
+                price=data['price'],
+                stock=data['stock']
+            )
+
+        with transaction.atomic():
+            group_ids = ProductGroup.for_keys(set(products))
+            for key, product in products.items():
+                product.group_id = group_ids[key]
+
+            previous_prices = {
+                (name, category_id, subcategory_id): price
+                for name, category_id, subcategory_id, price in Product.objects.filter(
+                    seller=self.seller,
+                    name__in={name for name, _, _ in products}
+                ).values_list('name', 'category_id', 'subcategory_id', 'price')
+            }
+            saved = Product.objects.bulk_create(
+                list(products.values()),
+                update_conflicts=True,
+                unique_fields=['seller', 'name', 'category', 'subcategory'],
+                update_fields=['price', 'stock']
+            )
+            ProductGroup.refresh(set(group_ids.values()))
+            record_prices([
+                (product.pk, product.price) for key, product in products.items()
+                if previous_prices.get(key) != product.price
+            ])
+
+        self.imported += len(saved)
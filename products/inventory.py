@@ -0,0 +1,97 @@
+from django.db import connection, transaction
+from team_management.models import StoreRole
+from .models import Product, ProductGroup
+from .imports import MAX_POSITIVE_INTEGER
+from .price_history import record_prices
+
+INVENTORY_ROLES = ('warehouse', 'manager')
+
+
+def get_managed_seller_ids(user):
+    seller_ids = set(StoreRole.objects.filter(
+        user=user,
+        is_active=True,
+        role__in=INVENTORY_ROLES
+    ).values_list('seller_id', flat=True))
+    if hasattr(user, 'seller'):
+        seller_ids.add(user.seller.id)
+    return seller_ids
+
+
+def apply_stock_updates(items, seller_ids):
+    results = [None] * len(items)
+    positions = {}
+    rows = {'id': [], 'delta': [], 'stock': [], 'price': []}
+
+    for index, item in enumerate(items):
+        product_id = item['product_id']
+        if product_id in positions:
+            results[index] = {
+                'product_id': product_id,
+                'success': False,
+                'error': 'این محصول بیش از یک بار در درخواست آمده است'
+            }
+            continue
+        positions[product_id] = index
+        rows['id'].append(product_id)
+        rows['delta'].append(item.get('delta'))
+        rows['stock'].append(item.get('stock'))
+        rows['price'].append(item.get('price'))
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {Product._meta.db_table} AS product
+                SET stock = COALESCE(changes.stock, product.stock + COALESCE(changes.delta, 0)),
+                    price = COALESCE(changes.price, product.price)
+                FROM unnest(
+                    %(id)s::bigint[], %(delta)s::integer[], %(stock)s::integer[], %(price)s::integer[]
+                ) AS changes(id, delta, stock, price)
+                JOIN {Product._meta.db_table} AS previous ON previous.id = changes.id
+                WHERE product.id = changes.id
+                    AND product.seller_id = ANY(%(seller_ids)s::bigint[])
+                    AND (changes.delta IS NULL OR product.stock::bigint + changes.delta
+                        BETWEEN 0 AND %(max_stock)s)
+                RETURNING product.id, product.stock, product.price, product.group_id,
+                    previous.price
+                """,
+                {**rows, 'seller_ids': list(seller_ids), 'max_stock': MAX_POSITIVE_INTEGER}
+            )
+            returned = cursor.fetchall()
+            updated = {row[0]: row[:4] for row in returned}
+
+        record_prices([(row[0], row[2]) for row in returned if row[2] != row[4]])
+
+        group_ids = {row[3] for row in updated.values() if row[3]}
+        if group_ids:
+            ProductGroup.refresh(group_ids)
+
+    missing = set(positions) - set(updated)
+    existing = set(Product.objects.filter(
+        id__in=missing,
+        seller_id__in=seller_ids
+    ).values_list('id', flat=True)) if missing else set()
+
+    for product_id, index in positions.items():
+        if product_id in updated:
+            _, stock, price, _ = updated[product_id]
+            results[index] = {
+                'product_id': product_id,
+                'success': True,
+                'stock': stock,
+                'price': price
+            }
+        elif product_id in existing:
+            results[index] = {
+                'product_id': product_id,
+                'success': False,
+                'error': 'موجودی از حد مجاز بیشتر می‌شود' if items[index]['delta'] > 0 else 'موجودی کافی نیست'
+            }
+        else:
+            results[index] = {
+                'product_id': product_id,
+                'success': False,
+                'error': 'محصول یافت نشد یا دسترسی ندارید'
+            }
+    return results
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from products.recommendations import (
+    RECOMMENDATION_BATCH_SIZE, RELATED_GROUPS, build_recommendations, reset_recommendations
+)
+
+
+class Command(BaseCommand):
+    help = 'Count product group co-occurrence in orders placed since the last run and rank related groups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=RECOMMENDATION_BATCH_SIZE)
+        parser.add_argument('--top', type=int, default=RELATED_GROUPS)
+        parser.add_argument('--rebuild', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            reset_recommendations()
+
+        runs = build_recommendations(options['batch_size'], options['top'])
+        if not runs:
+            self.stdout.write('No new orders')
+            return
+        self.stdout.write(
+            f'{sum(run.orders for run in runs)} orders counted up to order {runs[-1].last_order_id}, '
+            f'{sum(run.groups for run in runs)} group rankings updated'
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from products.price_history import (
+    PRICE_HISTORY_RAW_DAYS, PRICE_HISTORY_RETENTION_DAYS, compact_price_history, price_history_buffer
+)
+
+
+class Command(BaseCommand):
+    help = 'Downsample old price history points to daily min/max/close rows and drop expired days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--raw-days', type=int, default=PRICE_HISTORY_RAW_DAYS)
+        parser.add_argument('--retention-days', type=int, default=PRICE_HISTORY_RETENTION_DAYS)
+
+    def handle(self, *args, **options):
+        price_history_buffer.flush()
+        compacted, expired = compact_price_history(options['raw_days'], options['retention_days'])
+        self.stdout.write(f'{compacted} daily points written, {expired} expired points removed')
@@ -0,0 +1,81 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from products.models import ProductGroup
+from products.views import ProductGroupCursorPagination
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+class Command(BaseCommand):
+    help = 'Explain the public product listing queries and fail when one scans or sorts the whole table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-sort-rows', type=int, default=1000)
+        parser.add_argument('--verbose-plans', action='store_true')
+
+    def largest(self, field):
+        return ProductGroup.objects.exclude(**{field: None}).values(field).annotate(
+            groups=Count('id')
+        ).order_by('-groups').values_list(field, flat=True).first()
+
+    def handle(self, *args, **options):
+        if not ProductGroup.objects.exists():
+            raise CommandError('No product groups to explain')
+
+        prices = ProductGroup.objects.order_by('min_price').values_list('min_price', flat=True)
+        count = prices.count()
+        scopes = {
+            'all': {},
+            'category': {'category_id': self.largest('category_id')},
+            'subcategory': {'subcategory_id': self.largest('subcategory_id')},
+        }
+        price_filters = {
+            'none': {},
+            'price-range': {
+                'min_price__gte': prices[count // 4],
+                'min_price__lte': prices[count * 3 // 4]
+            },
+            'in-stock': {'total_stock__gt': 0},
+        }
+
+        failures = []
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for ordering_name, ordering in ProductGroupCursorPagination.ordering_options.items():
+                for scope_name, scope in scopes.items():
+                    for filter_name, filters in price_filters.items():
+                        if scope_name != 'all' and ordering_name not in ('name', 'price', '-price'):
+                            continue
+                        queryset = ProductGroup.objects.filter(
+                            representative__isnull=False, **scope, **filters
+                        ).order_by(*ordering)[:ProductGroupCursorPagination.page_size + 1]
+                        plan = json.loads(queryset.explain(format='json'))[0]['Plan']
+                        nodes = list(plan_nodes(plan))
+                        problems = [
+                            f"{node['Node Type']} of {node['Plan Rows']} rows" for node in nodes
+                            if node['Node Type'] == 'Seq Scan'
+                            or node['Node Type'] in ('Sort', 'Incremental Sort')
+                            and node['Plan Rows'] > options['max_sort_rows']
+                        ]
+                        indexes = sorted({node['Index Name'] for node in nodes if 'Index Name' in node})
+                        label = f'ordering={ordering_name} scope={scope_name} filter={filter_name}'
+                        status = 'FAIL' if problems else 'ok'
+                        self.stdout.write(f'{status:4} {label}: {", ".join(indexes) or "-"}')
+                        if options['verbose_plans']:
+                            self.stdout.write(json.dumps(plan, indent=2))
+                        if problems:
+                            failures.append(f'{label} ({", ".join(problems)})')
+
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError('Listing queries without index support:\n' + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('All listing queries are served by indexes'))
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+
+
+def build_product_groups(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ProductGroup = apps.get_model('products', 'ProductGroup')
+
+    rows = Product.objects.values('name', 'category', 'subcategory').annotate(
+        sellers_count=Count('id'),
+        min_price=Min('price'),
+        max_price=Max('price'),
+        total_stock=Sum('stock'),
+        representative_id=Min('id')
+    )
+    for row in rows.iterator():
+        group = ProductGroup.objects.create(
+            name=row['name'],
+            category_id=row['category'],
+            subcategory_id=row['subcategory'],
+            representative_id=row['representative_id'],
+            sellers_count=row['sellers_count'],
+            min_price=row['min_price'],
+            max_price=row['max_price'],
+            total_stock=row['total_stock'] or 0
+        )
+        Product.objects.filter(
+            name=row['name'],
+            category_id=row['category'],
+            subcategory_id=row['subcategory']
+        ).update(group=group)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('sellers_count', models.PositiveIntegerField(default=0)),
+                ('min_price', models.PositiveIntegerField(default=0)),
+                ('max_price', models.PositiveIntegerField(default=0)),
+                ('total_stock', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='products.category')),
+                ('representative', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='products.product')),
+                ('subcategory', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='products.subcategory')),
+            ],
+            options={
+                'verbose_name': 'گروه محصول',
+                'verbose_name_plural': 'گروه\u200cهای محصول',
+            },
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='group',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='offers', to='products.productgroup'),
+        ),
+        migrations.AddIndex(
+            model_name='productgroup',
+            index=models.Index(fields=['name', 'id'], name='products_pr_name_fe684c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productgroup',
+            index=models.Index(fields=['category', 'name'], name='products_pr_categor_002991_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productgroup',
+            index=models.Index(fields=['subcategory', 'name'], name='products_pr_subcate_1ae944_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='productgroup',
+            constraint=models.UniqueConstraint(fields=('name', 'category', 'subcategory'), name='unique_product_group'),
+        ),
+        migrations.RunPython(build_product_groups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_productgroup'),
+        ('sellers', '0003_alter_seller_user'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['name', 'id'], name='products_pr_name_37bd5c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['seller', 'name', 'id'], name='products_pr_seller__9bcbf0_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:49
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.db.models import Value
+from products.normalization import normalize_persian
+
+
+def index_product_groups(apps, schema_editor):
+    ProductGroup = apps.get_model('products', 'ProductGroup')
+    Product = apps.get_model('products', 'Product')
+
+    groups = ProductGroup.objects.select_related('category', 'subcategory')
+    for group in groups.iterator():
+        shop_names = normalize_persian(' '.join(
+            Product.objects.filter(group=group)
+            .values_list('seller__shop_name', flat=True).distinct()
+        ))
+        taxonomy = normalize_persian(' '.join(
+            obj.name for obj in (group.category, group.subcategory) if obj
+        ))
+        name = normalize_persian(group.name)
+        ProductGroup.objects.filter(pk=group.pk).update(
+            search_document=' '.join(part for part in (name, taxonomy, shop_names) if part),
+            search_vector=(
+                SearchVector(Value(name), weight='A', config='simple')
+                + SearchVector(Value(shop_names), weight='B', config='simple')
+                + SearchVector(Value(taxonomy), weight='C', config='simple')
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_name_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='productgroup',
+            name='search_document',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='productgroup',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='productgroup',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='product_group_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productgroup',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='product_group_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunPython(index_product_groups, migrations.RunPython.noop),
+    ]
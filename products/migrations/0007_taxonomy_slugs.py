@@ -0,0 +1,51 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:51
+
+from django.db import migrations, models
+from django.utils.text import slugify
+from products.normalization import normalize_persian
+
+
+def populate_slugs(apps, schema_editor):
+    for model_name in ('Category', 'Subcategory'):
+        model = apps.get_model('products', model_name)
+        used = set()
+        for obj in model.objects.order_by('id').iterator():
+            base = slugify(normalize_persian(obj.name), allow_unicode=True) or 'item'
+            slug = base
+            suffix = 2
+            while slug in used:
+                slug = f'{base}-{suffix}'
+                suffix += 1
+            used.add(slug)
+            model.objects.filter(pk=obj.pk).update(slug=slug)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_productgroup_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='slug',
+            field=models.SlugField(allow_unicode=True, blank=True, db_index=False, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='subcategory',
+            name='slug',
+            field=models.SlugField(allow_unicode=True, blank=True, db_index=False, max_length=255, null=True),
+        ),
+        migrations.RunPython(populate_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='category',
+            name='slug',
+            field=models.SlugField(allow_unicode=True, blank=True, max_length=255, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='subcategory',
+            name='slug',
+            field=models.SlugField(allow_unicode=True, blank=True, max_length=255, unique=True),
+        ),
+    ]
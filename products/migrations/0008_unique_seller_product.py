@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_taxonomy_slugs'),
+        ('sellers', '0003_alter_seller_user'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.UniqueConstraint(fields=('seller', 'name', 'category', 'subcategory'), name='unique_seller_product'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_stock_reservation'),
+        ('sellers', '0003_alter_seller_user'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='productgroup',
+            name='products_pr_categor_002991_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='productgroup',
+            name='products_pr_subcate_1ae944_idx',
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['seller', 'price', 'id'], name='products_pr_seller__40b0e7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productgroup',
+            index=models.Index(fields=['category', 'name', 'id'], name='products_pr_categor_c73a13_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productgroup',
+            index=models.Index(fields=['subcategory', 'name', 'id'], name='products_pr_subcate_adb9ef_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productgroup',
+            index=models.Index(fields=['min_price', 'id'], name='products_pr_min_pri_0529c8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productgroup',
+            index=models.Index(fields=['category', 'min_price', 'id'], name='products_pr_categor_a9d5c3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productgroup',
+            index=models.Index(fields=['subcategory', 'min_price', 'id'], name='products_pr_subcate_c07a38_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productgroup',
+            index=models.Index(fields=['-total_stock', 'id'], name='products_pr_total_s_6445f9_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0011_group_ratings'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productcomment',
+            index=models.Index(condition=models.Q(('is_approved', False)), fields=['created_at', 'id'], name='pending_comment_queue_idx'),
+        ),
+    ]
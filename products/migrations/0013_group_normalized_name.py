@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:22
+
+from django.db import migrations, models
+from products.normalization import normalize_persian
+
+
+def build_normalized_names(apps, schema_editor):
+    ProductGroup = apps.get_model('products', 'ProductGroup')
+
+    batch = []
+    for group in ProductGroup.objects.only('id', 'name').iterator(chunk_size=2000):
+        group.normalized_name = normalize_persian(group.name)
+        batch.append(group)
+        if len(batch) == 2000:
+            ProductGroup.objects.bulk_update(batch, ['normalized_name'])
+            batch = []
+    ProductGroup.objects.bulk_update(batch, ['normalized_name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0012_comment_moderation_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productgroup',
+            name='normalized_name',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.RunPython(build_normalized_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0014_group_recommendations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorded_at', models.DateTimeField()),
+                ('price', models.PositiveIntegerField()),
+                ('min_price', models.PositiveIntegerField()),
+                ('max_price', models.PositiveIntegerField()),
+                ('is_daily', models.BooleanField(default=False)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_history', to='products.product')),
+            ],
+            options={
+                'verbose_name': 'سابقه قیمت',
+                'verbose_name_plural': 'سوابق قیمت',
+                'indexes': [models.Index(fields=['product', 'recorded_at'], name='products_pr_product_045f8f_idx'), models.Index(condition=models.Q(('is_daily', False)), fields=['recorded_at'], name='price_history_raw_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('is_daily', True)), fields=('product', 'recorded_at'), name='unique_daily_price')],
+            },
+        ),
+        migrations.RunSQL(
+            """
+            INSERT INTO products_pricehistory (product_id, recorded_at, price, min_price, max_price, is_daily)
+            SELECT id, now(), price, price, price, FALSE FROM products_product
+            """,
+            migrations.RunSQL.noop
+        ),
+    ]
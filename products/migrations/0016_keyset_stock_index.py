@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0015_price_history'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='productgroup',
+            name='products_pr_total_s_6445f9_idx',
+        ),
+        migrations.AddIndex(
+            model_name='productgroup',
+            index=models.Index(fields=['total_stock', 'id'], name='products_pr_total_s_d109e0_idx'),
+        ),
+    ]
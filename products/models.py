@@ -1,16 +1,42 @@
-from django.db import models
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import connection, models
+from django.db.models import Count, F, Max, Min, Q, Sum
+from django.utils.text import slugify
 from sellers.models import Seller
+from .normalization import normalize_persian
+from .versions import bump_catalog_versions
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+SEARCH_CONFIG = 'simple'
+RATING_STARS = (1, 2, 3, 4, 5)
+
+
+def unique_slug(model, name, instance_pk=None):
+    base = slugify(normalize_persian(name), allow_unicode=True) or 'item'
+    slug = base
+    suffix = 2
+    while model.objects.filter(slug=slug).exclude(pk=instance_pk).exists():
+        slug = f'{base}-{suffix}'
+        suffix += 1
+    return slug
+
 
 class Category(models.Model):
     name = models.CharField(max_length=255)
+    slug = models.SlugField(max_length=255, unique=True, allow_unicode=True, blank=True)
     
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = unique_slug(Category, self.name, self.pk)
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = 'دسته‌بندی'
         verbose_name_plural = 'دسته‌بندی‌ها'
@@ -18,14 +44,251 @@ class Category(models.Model):
 class Subcategory(models.Model):
     name = models.CharField(max_length=255)
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
+    slug = models.SlugField(max_length=255, unique=True, allow_unicode=True, blank=True)
     
     def __str__(self):
         return f"{self.name}"
 
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = unique_slug(Subcategory, self.name, self.pk)
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = 'زیردسته‌بندی'
         verbose_name_plural = 'زیردسته‌بندی‌ها'
 
+class ProductGroup(models.Model):
+    name = models.CharField(max_length=255)
+    normalized_name = models.CharField(max_length=255, blank=True, default='')
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True)
+    subcategory = models.ForeignKey(Subcategory, on_delete=models.SET_NULL, null=True)
+    representative = models.ForeignKey(
+        'Product',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    sellers_count = models.PositiveIntegerField(default=0)
+    min_price = models.PositiveIntegerField(default=0)
+    max_price = models.PositiveIntegerField(default=0)
+    total_stock = models.PositiveIntegerField(default=0)
+    search_document = models.TextField(blank=True, default='')
+    search_vector = SearchVectorField(null=True, blank=True)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'گروه محصول'
+        verbose_name_plural = 'گروه‌های محصول'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name', 'category', 'subcategory'],
+                name='unique_product_group'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['name', 'id']),
+            models.Index(fields=['category', 'name', 'id']),
+            models.Index(fields=['subcategory', 'name', 'id']),
+            models.Index(fields=['min_price', 'id']),
+            models.Index(fields=['category', 'min_price', 'id']),
+            models.Index(fields=['subcategory', 'min_price', 'id']),
+            models.Index(fields=['total_stock', 'id']),
+            GinIndex(fields=['search_vector'], name='product_group_search_idx'),
+            GinIndex(
+                fields=['search_document'],
+                name='product_group_trgm_idx',
+                opclasses=['gin_trgm_ops']
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def rating_average(self):
+        if not self.rating_count:
+            return None
+        return round(self.rating_sum / self.rating_count, 2)
+
+    @property
+    def rating_histogram(self):
+        return {star: getattr(self, f'rating_{star}') for star in RATING_STARS}
+
+    @classmethod
+    def for_product(cls, product):
+        group, _ = cls.objects.get_or_create(
+            name=product.name,
+            category_id=product.category_id,
+            subcategory_id=product.subcategory_id,
+            defaults={'normalized_name': normalize_persian(product.name)}
+        )
+        return group
+
+    def update_stats(self):
+        stats = self.offers.aggregate(
+            sellers_count=Count('id'),
+            min_price=Min('price'),
+            max_price=Max('price'),
+            total_stock=Sum('stock'),
+            representative_id=Min('id')
+        )
+        bump_catalog_versions([self.pk], [self.category_id])
+        if not stats['sellers_count']:
+            self.delete()
+            return
+
+        self.sellers_count = stats['sellers_count']
+        self.min_price = stats['min_price']
+        self.max_price = stats['max_price']
+        self.total_stock = stats['total_stock'] or 0
+        self.representative_id = stats['representative_id']
+        self.save(update_fields=[
+            'sellers_count', 'min_price', 'max_price', 'total_stock',
+            'representative', 'updated_at'
+        ])
+
+    def update_search(self):
+        ProductGroup.refresh([self.pk])
+
+    @classmethod
+    def refresh(cls, group_ids):
+        offers = Product.objects.filter(group_id__in=group_ids).values(
+            'group_id', 'group__category_id', 'group__name',
+            'group__category__name', 'group__subcategory__name'
+        ).annotate(
+            sellers_count=Count('id'),
+            min_price=Min('price'),
+            max_price=Max('price'),
+            total_stock=Sum('stock'),
+            representative_id=Min('id'),
+            shop_names=ArrayAgg('seller__shop_name', distinct=True)
+        ).order_by()
+
+        rows = {
+            'id': [], 'sellers_count': [], 'min_price': [], 'max_price': [],
+            'total_stock': [], 'representative_id': [], 'document': [],
+            'name': [], 'shop_names': [], 'taxonomy': []
+        }
+        category_ids = set()
+        for offer in offers:
+            category_ids.add(offer['group__category_id'])
+            name = normalize_persian(offer['group__name'])
+            shop_names = normalize_persian(' '.join(filter(None, offer['shop_names'])))
+            taxonomy = normalize_persian(' '.join(filter(None, (
+                offer['group__category__name'], offer['group__subcategory__name']
+            ))))
+            rows['id'].append(offer['group_id'])
+            rows['sellers_count'].append(offer['sellers_count'])
+            rows['min_price'].append(offer['min_price'])
+            rows['max_price'].append(offer['max_price'])
+            rows['total_stock'].append(offer['total_stock'] or 0)
+            rows['representative_id'].append(offer['representative_id'])
+            rows['document'].append(' '.join(part for part in (name, taxonomy, shop_names) if part))
+            rows['name'].append(name)
+            rows['shop_names'].append(shop_names)
+            rows['taxonomy'].append(taxonomy)
+
+        empty_group_ids = set(group_ids) - set(rows['id'])
+        if empty_group_ids:
+            empty_groups = cls.objects.filter(id__in=empty_group_ids)
+            category_ids.update(empty_groups.values_list('category_id', flat=True))
+            empty_groups.delete()
+        bump_catalog_versions(group_ids, category_ids)
+        if not rows['id']:
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {cls._meta.db_table} AS product_group
+                SET sellers_count = refreshed.sellers_count,
+                    min_price = refreshed.min_price,
+                    max_price = refreshed.max_price,
+                    total_stock = refreshed.total_stock,
+                    representative_id = refreshed.representative_id,
+                    updated_at = now(),
+                    normalized_name = refreshed.name,
+                    search_document = refreshed.document,
+                    search_vector = setweight(to_tsvector(%(config)s, refreshed.name), 'A')
+                        || setweight(to_tsvector(%(config)s, refreshed.shop_names), 'B')
+                        || setweight(to_tsvector(%(config)s, refreshed.taxonomy), 'C')
+                FROM unnest(
+                    %(id)s::bigint[], %(sellers_count)s::integer[], %(min_price)s::integer[],
+                    %(max_price)s::integer[], %(total_stock)s::integer[],
+                    %(representative_id)s::bigint[], %(document)s::text[], %(name)s::text[],
+                    %(shop_names)s::text[], %(taxonomy)s::text[]
+                ) AS refreshed(
+                    id, sellers_count, min_price, max_price, total_stock,
+                    representative_id, document, name, shop_names, taxonomy
+                )
+                WHERE product_group.id = refreshed.id
+                """,
+                {'config': SEARCH_CONFIG, **rows}
+            )
+
+    @classmethod
+    def apply_rating(cls, group_id, rating, delta):
+        cls.objects.filter(pk=group_id).update(**{
+            'rating_count': F('rating_count') + delta,
+            'rating_sum': F('rating_sum') + delta * rating,
+            f'rating_{rating}': F(f'rating_{rating}') + delta,
+        })
+
+    @classmethod
+    def refresh_ratings(cls, group_ids):
+        stats = {
+            row.pop('product__group_id'): row
+            for row in ProductComment.objects.filter(
+                product__group_id__in=group_ids,
+                is_approved=True,
+                rating__isnull=False
+            ).values('product__group_id').annotate(
+                rating_count=Count('id'),
+                rating_sum=Sum('rating'),
+                **{f'rating_{star}': Count('id', filter=Q(rating=star)) for star in RATING_STARS}
+            ).order_by()
+        }
+        empty = dict.fromkeys(['rating_count', 'rating_sum', *(f'rating_{star}' for star in RATING_STARS)], 0)
+        groups = list(cls.objects.filter(pk__in=group_ids))
+        for group in groups:
+            for field, value in stats.get(group.pk, empty).items():
+                setattr(group, field, value)
+        cls.objects.bulk_update(groups, list(empty))
+        bump_catalog_versions(
+            [group.pk for group in groups], [group.category_id for group in groups]
+        )
+
+    @classmethod
+    def for_keys(cls, keys):
+        cls.objects.bulk_create([
+            cls(
+                name=name,
+                normalized_name=normalize_persian(name),
+                category_id=category_id,
+                subcategory_id=subcategory_id
+            )
+            for name, category_id, subcategory_id in keys
+        ], ignore_conflicts=True)
+
+        groups = cls.objects.filter(name__in={name for name, _, _ in keys}).values_list(
+            'name', 'category_id', 'subcategory_id', 'id'
+        )
+        return {
+            (name, category_id, subcategory_id): group_id
+            for name, category_id, subcategory_id, group_id in groups
+            if (name, category_id, subcategory_id) in keys
+        }
+
+
 class Product(models.Model):
     seller = models.ForeignKey(Seller, on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
@@ -33,20 +296,106 @@ class Product(models.Model):
     subcategory = models.ForeignKey(Subcategory, on_delete=models.SET_NULL, null=True)    
     price = models.PositiveIntegerField()
     stock = models.PositiveIntegerField()
+    group = models.ForeignKey(
+        ProductGroup,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='offers'
+    )
     
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_price = instance.__dict__.get('price')
+        return instance
+
+    @property
+    def price_changed(self):
+        return self.price != getattr(self, '_loaded_price', None)
+
     class Meta:
         verbose_name = 'محصول'
         verbose_name_plural = 'محصولات'
+        indexes = [
+            models.Index(fields=['name', 'id']),
+            models.Index(fields=['seller', 'name', 'id']),
+            models.Index(fields=['seller', 'price', 'id']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['seller', 'name', 'category', 'subcategory'],
+                name='unique_seller_product'
+            )
+        ]
+
+class PriceHistory(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='price_history')
+    recorded_at = models.DateTimeField()
+    price = models.PositiveIntegerField()
+    min_price = models.PositiveIntegerField()
+    max_price = models.PositiveIntegerField()
+    is_daily = models.BooleanField(default=False)
+
+    class Meta:
+        verbose_name = 'سابقه قیمت'
+        verbose_name_plural = 'سوابق قیمت'
+        indexes = [
+            models.Index(fields=['product', 'recorded_at']),
+            models.Index(
+                fields=['recorded_at'],
+                condition=Q(is_daily=False),
+                name='price_history_raw_idx'
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['product', 'recorded_at'],
+                condition=Q(is_daily=True),
+                name='unique_daily_price'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.product} - {self.price}"
+
+class StockReservation(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='stock_reservations')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reservations')
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'رزرو موجودی'
+        verbose_name_plural = 'رزروهای موجودی'
+        indexes = [
+            models.Index(
+                fields=['product', 'expires_at'],
+                include=['quantity'],
+                name='stock_reservation_live_idx'
+            ),
+            models.Index(fields=['expires_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'product'],
+                name='unique_user_stock_reservation'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} عدد {self.product} برای {self.user}"
 
 class ProductComment(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='comments')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comments')
     text = models.TextField()
     rating = models.PositiveSmallIntegerField(
-        choices=[(1, '1 ستاره'), (2, '2 ستاره'), (3, '3 ستاره'), (4, '4 ستاره'), (5, '5 ستاره')],
+        choices=[(star, f'{star} ستاره') for star in RATING_STARS],
         null=True, blank=True
     )
     is_approved = models.BooleanField(default=False)
@@ -57,6 +406,18 @@ class ProductComment(models.Model):
         ordering = ['-created_at']
         verbose_name = 'نظر محصول'
         verbose_name_plural = 'نظرات محصولات'
+        indexes = [
+            models.Index(
+                fields=['product', '-created_at', '-id'],
+                condition=Q(is_approved=True),
+                name='approved_comment_page_idx'
+            ),
+            models.Index(
+                fields=['created_at', 'id'],
+                condition=Q(is_approved=False),
+                name='pending_comment_queue_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['user', 'product'],
@@ -66,5 +427,49 @@ class ProductComment(models.Model):
             )
         ]
 
+    @property
+    def rating_contribution(self):
+        return self.rating if self.is_approved and self.rating else None
+
+    def __str__(self):
+        return f"Comment by {self.user.username} on {self.product.name}"
+
+class ProductGroupCooccurrence(models.Model):
+    group = models.ForeignKey(ProductGroup, on_delete=models.CASCADE, related_name='+')
+    related = models.ForeignKey(ProductGroup, on_delete=models.CASCADE, related_name='+')
+    orders = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['group', 'related'],
+                name='unique_group_cooccurrence'
+            )
+        ]
+
+
+class RelatedProductGroup(models.Model):
+    group = models.ForeignKey(ProductGroup, on_delete=models.CASCADE, related_name='related_groups')
+    related = models.ForeignKey(ProductGroup, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    orders = models.PositiveIntegerField()
+
+    class Meta:
+        verbose_name = 'محصول مرتبط'
+        verbose_name_plural = 'محصولات مرتبط'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['group', 'rank'],
+                name='unique_related_group_rank'
+            )
+        ]
+
+
+class RecommendationRun(models.Model):
+    last_order_id = models.BigIntegerField()
+    orders = models.PositiveIntegerField(default=0)
+    groups = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
     def __str__(self):
-        return f"Comment by {self.user.username} on {self.product.name}"
\ No newline at end of file
+        return f"Recommendations up to order {self.last_order_id}"
@@ -0,0 +1,78 @@
+from django.db import connection, transaction
+from .models import Product, ProductComment, ProductGroup
+from .versions import bump_versions, comments_scope
+
+
+def _bump_comments(product_ids):
+    scopes = [comments_scope(product_id) for product_id in set(product_ids)]
+    if scopes:
+        transaction.on_commit(lambda: bump_versions(scopes))
+
+
+def approve_comments(comment_ids):
+    comment_ids = list(dict.fromkeys(comment_ids))
+    table = ProductComment._meta.db_table
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {table} AS comment
+                SET is_approved = TRUE, updated_at = now()
+                WHERE comment.id IN (
+                    SELECT DISTINCT ON (pending.user_id, pending.product_id) pending.id
+                    FROM {table} AS pending
+                    WHERE pending.id = ANY(%(ids)s::bigint[]) AND NOT pending.is_approved
+                    ORDER BY pending.user_id, pending.product_id, pending.created_at DESC, pending.id DESC
+                )
+                AND NOT EXISTS (
+                    SELECT 1 FROM {table} AS approved
+                    WHERE approved.user_id = comment.user_id
+                        AND approved.product_id = comment.product_id
+                        AND approved.is_approved
+                )
+                RETURNING comment.id, comment.product_id
+                """,
+                {'ids': comment_ids}
+            )
+            approved = dict(cursor.fetchall())
+
+        if approved:
+            group_ids = set(Product.objects.filter(
+                id__in=set(approved.values()), group__isnull=False
+            ).values_list('group_id', flat=True))
+            ProductGroup.refresh_ratings(group_ids)
+            _bump_comments(approved.values())
+
+    skipped = []
+    remaining = [comment_id for comment_id in comment_ids if comment_id not in approved]
+    if remaining:
+        states = dict(ProductComment.objects.filter(id__in=remaining).values_list('id', 'is_approved'))
+        for comment_id in remaining:
+            if comment_id not in states:
+                reason = 'نظر یافت نشد'
+            elif states[comment_id]:
+                reason = 'این نظر قبلاً تأیید شده است'
+            else:
+                reason = 'کاربر برای این محصول نظر تأییدشده دیگری دارد'
+            skipped.append({'id': comment_id, 'error': reason})
+
+    return {'approved': list(approved), 'skipped': skipped}
+
+
+def reject_comments(comment_ids):
+    comment_ids = list(dict.fromkeys(comment_ids))
+    with transaction.atomic():
+        pending = ProductComment.objects.filter(
+            id__in=comment_ids, is_approved=False
+        ).select_for_update()
+        rejected = set(pending.values_list('id', flat=True))
+        if rejected:
+            ProductComment.objects.filter(id__in=rejected).delete()
+
+    return {
+        'rejected': sorted(rejected),
+        'skipped': [
+            {'id': comment_id, 'error': 'نظر در صف بررسی یافت نشد'}
+            for comment_id in comment_ids if comment_id not in rejected
+        ]
+    }
@@ -0,0 +1,31 @@
+import re
+
+PERSIAN_CHARACTER_MAP = str.maketrans({
+    'ي': 'ی',
+    'ى': 'ی',
+    'ك': 'ک',
+    'ة': 'ه',
+    'أ': 'ا',
+    'إ': 'ا',
+    'ؤ': 'و',
+    '\u200c': ' ',
+    '\u200f': None,
+    '\u0640': None,
+    **{chr(0x06F0 + digit): str(digit) for digit in range(10)},
+    **{chr(0x0660 + digit): str(digit) for digit in range(10)},
+})
+
+DIACRITICS_RE = re.compile('[\u064b-\u0652\u0670]')
+WHITESPACE_RE = re.compile(r'\s+')
+TERM_RE = re.compile(r'\w+')
+
+
+def normalize_persian(text):
+    if not text:
+        return ''
+    text = DIACRITICS_RE.sub('', text.translate(PERSIAN_CHARACTER_MAP))
+    return WHITESPACE_RE.sub(' ', text).strip().lower()
+
+
+def search_terms(text):
+    return TERM_RE.findall(normalize_persian(text))
@@ -0,0 +1,146 @@
+import atexit
+import logging
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import PriceHistory, Product
+from .versions import PRICE_HISTORY_SCOPE, bump_version, bump_versions, price_history_scope
+
+logger = logging.getLogger(__name__)
+
+PRICE_HISTORY_BUFFER_SIZE = 500
+PRICE_HISTORY_FLUSH_INTERVAL = 5
+PRICE_HISTORY_RAW_DAYS = 7
+PRICE_HISTORY_RETENTION_DAYS = 730
+PRICE_HISTORY_DEFAULT_DAYS = 30
+
+
+class PriceHistoryBuffer:
+    def __init__(self, size=PRICE_HISTORY_BUFFER_SIZE, interval=PRICE_HISTORY_FLUSH_INTERVAL):
+        self.size = size
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._points = []
+        self._timer = None
+
+    def add(self, points):
+        with self._lock:
+            self._points.extend(points)
+            full = len(self._points) >= self.size
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.interval, self._flush_in_background)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            points, self._points = self._points, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not points:
+            return 0
+        try:
+            write_points(points)
+        except Exception:
+            logger.exception('Could not write %s price history points', len(points))
+            return 0
+        return len(points)
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+
+price_history_buffer = PriceHistoryBuffer()
+atexit.register(price_history_buffer.flush)
+
+
+def record_prices(prices):
+    recorded_at = timezone.now()
+    points = [(product_id, price, recorded_at) for product_id, price in prices]
+    if points:
+        transaction.on_commit(lambda: price_history_buffer.add(points))
+
+
+def write_points(points):
+    PriceHistory.objects.bulk_create([
+        PriceHistory(
+            product_id=product_id,
+            recorded_at=recorded_at,
+            price=price,
+            min_price=price,
+            max_price=price
+        )
+        for product_id, price, recorded_at in points
+    ])
+    group_ids = set(Product.objects.filter(
+        id__in={product_id for product_id, _, _ in points}, group__isnull=False
+    ).values_list('group_id', flat=True))
+    if group_ids:
+        bump_versions([price_history_scope(group_id) for group_id in group_ids])
+
+
+def compact_price_history(raw_days=PRICE_HISTORY_RAW_DAYS, retention_days=PRICE_HISTORY_RETENTION_DAYS):
+    now = timezone.localtime()
+    cutoff = (now - timedelta(days=raw_days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    table = PriceHistory._meta.db_table
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                WITH raw AS (
+                    DELETE FROM {table}
+                    WHERE NOT is_daily AND recorded_at < %(cutoff)s
+                    RETURNING product_id, recorded_at, price, min_price, max_price
+                )
+                INSERT INTO {table} AS daily
+                    (product_id, recorded_at, price, min_price, max_price, is_daily)
+                SELECT product_id, date_trunc('day', recorded_at, %(tz)s),
+                    (array_agg(price ORDER BY recorded_at DESC))[1],
+                    MIN(min_price), MAX(max_price), TRUE
+                FROM raw
+                GROUP BY product_id, date_trunc('day', recorded_at, %(tz)s)
+                ON CONFLICT (product_id, recorded_at) WHERE is_daily
+                DO UPDATE SET price = EXCLUDED.price,
+                    min_price = LEAST(daily.min_price, EXCLUDED.min_price),
+                    max_price = GREATEST(daily.max_price, EXCLUDED.max_price)
+                """,
+                {'cutoff': cutoff, 'tz': settings.TIME_ZONE}
+            )
+            compacted = cursor.rowcount
+
+        expired = 0
+        if retention_days:
+            expired, _ = PriceHistory.objects.filter(
+                is_daily=True, recorded_at__lt=now - timedelta(days=retention_days)
+            ).delete()
+        transaction.on_commit(lambda: bump_version(PRICE_HISTORY_SCOPE))
+    return compacted, expired
+
+
+def group_price_series(group_id, start, end):
+    points = PriceHistory.objects.filter(
+        product__group_id=group_id,
+        recorded_at__gte=start,
+        recorded_at__lt=end
+    ).order_by('product_id', 'recorded_at').values_list(
+        'product_id', 'product__seller_id', 'recorded_at', 'price', 'min_price', 'max_price', 'is_daily'
+    )
+    series = {}
+    for product_id, seller_id, recorded_at, price, min_price, max_price, is_daily in points:
+        offer = series.setdefault(product_id, {'product_id': product_id, 'seller_id': seller_id, 'points': []})
+        offer['points'].append({
+            'recorded_at': recorded_at,
+            'price': price,
+            'min_price': min_price,
+            'max_price': max_price,
+            'daily': is_daily,
+        })
+    return list(series.values())
@@ -0,0 +1,131 @@
+from datetime import timedelta
+from django.apps import apps
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+from .models import Product, ProductGroupCooccurrence, RecommendationRun, RelatedProductGroup
+from .versions import RECOMMENDATIONS_SCOPE, bump_version
+
+RECOMMENDATION_BATCH_SIZE = 5000
+RELATED_GROUPS = 20
+ORDER_SETTLE_TIME = timedelta(minutes=5)
+
+
+def last_processed_order_id():
+    run = RecommendationRun.objects.order_by('-id').first()
+    return run.last_order_id if run else 0
+
+
+def count_cooccurrences(after, until):
+    OrderItem = apps.get_model('order', 'OrderItem')
+    Order = apps.get_model('order', 'Order')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH basket AS (
+                SELECT DISTINCT item.order_id, product.group_id
+                FROM {OrderItem._meta.db_table} AS item
+                JOIN {Order._meta.db_table} AS purchase ON purchase.id = item.order_id
+                JOIN {Product._meta.db_table} AS product ON product.id = item.product_id
+                WHERE item.order_id > %(after)s AND item.order_id <= %(until)s
+                    AND purchase.status <> 'cancelled'
+                    AND product.group_id IS NOT NULL
+            ), pairs AS (
+                SELECT basket.group_id, other.group_id AS related_id, COUNT(*) AS orders
+                FROM basket
+                JOIN basket AS other
+                    ON other.order_id = basket.order_id AND other.group_id <> basket.group_id
+                GROUP BY basket.group_id, other.group_id
+            ), counted AS (
+                INSERT INTO {ProductGroupCooccurrence._meta.db_table} AS cooccurrence
+                    (group_id, related_id, orders)
+                SELECT group_id, related_id, orders FROM pairs
+                ON CONFLICT (group_id, related_id)
+                DO UPDATE SET orders = cooccurrence.orders + EXCLUDED.orders
+                RETURNING group_id
+            )
+            SELECT
+                (SELECT COUNT(DISTINCT order_id) FROM basket),
+                ARRAY(SELECT DISTINCT group_id FROM counted)
+            """,
+            {'after': after, 'until': until}
+        )
+        orders, group_ids = cursor.fetchone()
+    return orders, group_ids
+
+
+def rank_related_groups(group_ids, top=RELATED_GROUPS):
+    if not group_ids:
+        return
+    related = RelatedProductGroup._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {related} WHERE group_id = ANY(%s::bigint[])', [group_ids])
+        cursor.execute(
+            f"""
+            INSERT INTO {related} (group_id, related_id, rank, orders)
+            SELECT group_id, related_id, rank, orders
+            FROM (
+                SELECT group_id, related_id, orders,
+                    row_number() OVER (PARTITION BY group_id ORDER BY orders DESC, related_id) AS rank
+                FROM {ProductGroupCooccurrence._meta.db_table}
+                WHERE group_id = ANY(%(ids)s::bigint[])
+            ) AS ranked
+            WHERE rank <= %(top)s
+            """,
+            {'ids': group_ids, 'top': top}
+        )
+
+
+def build_recommendations(batch_size=RECOMMENDATION_BATCH_SIZE, top=RELATED_GROUPS):
+    Order = apps.get_model('order', 'Order')
+    CheckoutJob = apps.get_model('order', 'CheckoutJob')
+    until = Order.objects.filter(
+        created_at__lt=timezone.now() - ORDER_SETTLE_TIME
+    ).aggregate(last=Max('id'))['last'] or 0
+    oldest_queued = CheckoutJob.objects.filter(status='queued').aggregate(first=Min('order_id'))['first']
+    if oldest_queued is not None:
+        until = min(until, oldest_queued - 1)
+    runs = []
+    while True:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(hashtext('products.recommendations'))")
+            after = last_processed_order_id()
+            if after >= until:
+                break
+            end = min(after + batch_size, until)
+            orders, group_ids = count_cooccurrences(after, end)
+            rank_related_groups(group_ids, top)
+            runs.append(RecommendationRun.objects.create(
+                last_order_id=end, orders=orders, groups=len(group_ids)
+            ))
+            transaction.on_commit(lambda: bump_version(RECOMMENDATIONS_SCOPE))
+    return runs
+
+
+def reset_recommendations():
+    with transaction.atomic():
+        RelatedProductGroup.objects.all().delete()
+        ProductGroupCooccurrence.objects.all().delete()
+        RecommendationRun.objects.all().delete()
+        transaction.on_commit(lambda: bump_version(RECOMMENDATIONS_SCOPE))
+
+
+def related_products(group_id):
+    rows = RelatedProductGroup.objects.filter(
+        group_id=group_id, related__representative__isnull=False
+    ).order_by('rank').values(
+        'related_id', 'related__representative_id', 'related__name',
+        'related__min_price', 'related__sellers_count', 'orders'
+    )
+    return [
+        {
+            'product_id': row['related__representative_id'],
+            'product_group_id': row['related_id'],
+            'name': row['related__name'],
+            'min_price': row['related__min_price'],
+            'sellers_count': row['related__sellers_count'],
+            'orders': row['orders'],
+        }
+        for row in rows
+    ]
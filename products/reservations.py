@@ -0,0 +1,136 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+from .models import Product, ProductGroup, StockReservation
+from .versions import bump_group_versions
+
+RELEASE_BATCH_SIZE = 5000
+
+
+class InsufficientStock(Exception):
+    pass
+
+
+def reservation_expiry():
+    return timezone.now() + timedelta(seconds=settings.STOCK_RESERVATION_TTL)
+
+
+def live_reservations():
+    return StockReservation.objects.filter(expires_at__gt=timezone.now())
+
+
+def reserved_quantities(product_ids, exclude_user=None):
+    holds = live_reservations().filter(product_id__in=product_ids)
+    if exclude_user is not None:
+        holds = holds.exclude(user=exclude_user)
+    return dict(
+        holds.values('product_id').annotate(total=Sum('quantity')).values_list('product_id', 'total')
+    )
+
+
+def available_stock(products, exclude_user=None):
+    reserved = reserved_quantities([product.id for product in products], exclude_user)
+    return {
+        product.id: max(product.stock - reserved.get(product.id, 0), 0)
+        for product in products
+    }
+
+
+def reserve_stock(user, product_id, quantity):
+    with transaction.atomic():
+        product = Product.objects.select_for_update().get(pk=product_id)
+        reserved = reserved_quantities([product.id], exclude_user=user).get(product.id, 0)
+        available = product.stock - reserved
+        if quantity > available:
+            raise InsufficientStock(f"موجودی محصول {product.name} کافی نیست")
+
+        StockReservation.objects.update_or_create(
+            user=user,
+            product=product,
+            defaults={'quantity': quantity, 'expires_at': reservation_expiry()}
+        )
+        bump_group_versions([product.group_id])
+    return product, available
+
+
+def _release(holds):
+    released = list(holds.values_list('id', 'product__group_id'))
+    if not released:
+        return 0
+    ids, group_ids = zip(*released)
+    with transaction.atomic():
+        StockReservation.objects.filter(id__in=ids).delete()
+        bump_group_versions(group_ids)
+    return len(ids)
+
+
+def release_stock(user, product_ids=None):
+    holds = StockReservation.objects.filter(user=user)
+    if product_ids is not None:
+        holds = holds.filter(product_id__in=product_ids)
+    return _release(holds)
+
+
+def release_expired(batch_size=RELEASE_BATCH_SIZE):
+    released = 0
+    while True:
+        batch = _release(StockReservation.objects.filter(
+            expires_at__lte=timezone.now()
+        ).order_by('id')[:batch_size])
+        if not batch:
+            return released
+        released += batch
+
+
+def consume_reservations(user, quantities):
+    product_ids = sorted(quantities)
+    products = list(Product.objects.select_for_update(of=('self',)).filter(
+        id__in=product_ids
+    ).order_by('id').values_list(
+        'id', 'name', 'price', 'seller_id', 'group_id', 'stock',
+        'category__name', 'seller__shop_name', 'seller__user_id'
+    ))
+    if len(products) < len(product_ids):
+        raise Product.DoesNotExist
+
+    reserved = reserved_quantities(product_ids, exclude_user=user)
+    for product_id, name, _, _, _, stock, _, _, _ in products:
+        if stock - quantities[product_id] < reserved.get(product_id, 0):
+            raise InsufficientStock(f"موجودی محصول {name} کافی نیست")
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {Product._meta.db_table} AS product
+            SET stock = product.stock - items.quantity
+            FROM unnest(%(id)s::bigint[], %(quantity)s::integer[]) AS items(id, quantity)
+            WHERE product.id = items.id AND product.stock >= items.quantity
+            """,
+            {
+                'id': product_ids,
+                'quantity': [quantities[product_id] for product_id in product_ids],
+            }
+        )
+        if cursor.rowcount != len(product_ids):
+            raise InsufficientStock('موجودی برخی محصولات کافی نیست')
+
+    consumed = {
+        product_id: {
+            'name': name,
+            'price': price,
+            'seller_id': seller_id,
+            'group_id': group_id,
+            'category_name': category_name or '',
+            'shop_name': shop_name,
+            'seller_user_id': seller_user_id,
+        }
+        for product_id, name, price, seller_id, group_id, _, category_name, shop_name, seller_user_id in products
+    }
+
+    release_stock(user, product_ids)
+    group_ids = {row['group_id'] for row in consumed.values() if row['group_id']}
+    if group_ids:
+        ProductGroup.refresh(group_ids)
+    return consumed
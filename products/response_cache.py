@@ -0,0 +1,63 @@
+import hashlib
+from django.core.cache import caches
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+RESPONSE_CACHE_ALIAS = 'responses'
+HITS_KEY = 'products:response-cache:hits'
+MISSES_KEY = 'products:response-cache:misses'
+
+
+def response_cache():
+    return caches[RESPONSE_CACHE_ALIAS]
+
+
+def is_cacheable(request):
+    return (
+        request.method == 'GET'
+        and not request.user.is_authenticated
+        and request.accepted_renderer.format != 'api'
+    )
+
+
+def _count(key):
+    cache = response_cache()
+    if not cache.add(key, 1, timeout=None):
+        cache.incr(key)
+
+
+def cached_response(view, request, etag, render):
+    cache = response_cache()
+    key = 'products:response:%s' % hashlib.sha1(
+        f'{etag}|{request.accepted_media_type}'.encode()
+    ).hexdigest()
+
+    entry = cache.get(key)
+    if entry is not None:
+        _count(HITS_KEY)
+        status_code, content_type, content = entry
+        response = HttpResponse(content, status=status_code, content_type=content_type)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    _count(MISSES_KEY)
+    response = render()
+    if response.status_code == 200 and isinstance(response, Response):
+        response.accepted_renderer = request.accepted_renderer
+        response.accepted_media_type = request.accepted_media_type
+        response.renderer_context = view.get_renderer_context()
+        response.render()
+        cache.set(key, (response.status_code, response['Content-Type'], response.content))
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+def cache_stats():
+    counters = response_cache().get_many([HITS_KEY, MISSES_KEY])
+    hits = counters.get(HITS_KEY, 0)
+    misses = counters.get(MISSES_KEY, 0)
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+    }
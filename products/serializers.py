@@ -1,7 +1,13 @@
+from collections import defaultdict
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
-from .models import Category, Subcategory, Product,ProductComment
+from .models import Category, Subcategory, Product,ProductComment, ProductGroup
 from django.contrib.auth import get_user_model
+from django.db.models.manager import BaseManager
+from .imports import MAX_POSITIVE_INTEGER
+from .reservations import reserved_quantities
+from .taxonomy import taxonomy_cache
+from backend.serializers import DynamicFieldsMixin
 
 User = get_user_model()
 
@@ -10,24 +16,43 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'username', 'first_name', 'last_name']
 
-class ProductCommentSerializer(serializers.ModelSerializer):
+class ProductCommentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     product_name = serializers.CharField(source='product.name', read_only=True)
     product_id = serializers.IntegerField(source='product.id', read_only=True)
 
     class Meta:
         model = ProductComment
-        fields = ['id', 'user', 'product_name', 'product_id', 'text', 'created_at', 'updated_at']
+        fields = ['id', 'user', 'product_name', 'product_id', 'text', 'rating', 'created_at', 'updated_at']
         read_only_fields = ['id', 'user', 'product_name', 'product_id', 'created_at', 'updated_at']
 
 
+class CommentModerationSerializer(serializers.Serializer):
+    action = serializers.ChoiceField(choices=['approve', 'reject'])
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=5000
+    )
+
+
 class CreateProductCommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProductComment
-        fields = ['text']
+        fields = ['text', 'rating']
+
+
+class ProductListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, BaseManager) else data
+        products = list(iterable)
+        self.child.live_stock = False
+        self.child.prefetch_offers(products)
+        return [self.child.to_representation(item) for item in products]
 
- 
-class ProductSerializer(serializers.ModelSerializer):
+
+class ProductSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    live_stock = True
     category = serializers.CharField(source='category.name')
     subcategory = serializers.CharField(source='subcategory.name')
     category_id = serializers.SerializerMethodField()
@@ -35,47 +60,125 @@ class ProductSerializer(serializers.ModelSerializer):
     sellers_count = serializers.SerializerMethodField()
     sellers = serializers.SerializerMethodField()
     product_group_id = serializers.SerializerMethodField()
+    rating = serializers.SerializerMethodField()
+    min_price = serializers.SerializerMethodField()
+    max_price = serializers.SerializerMethodField()
+    total_stock = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
         fields = ['id', 'name', 'category', 'subcategory', 'category_id', 
-                'subcategory_id', 'price', 'stock', 'sellers', 'sellers_count',
-                'product_group_id']
+                'subcategory_id', 'price', 'stock', 'min_price', 'max_price', 'total_stock',
+                'sellers', 'sellers_count', 'product_group_id', 'rating']
         read_only_fields = ['id']
-    
+        list_serializer_class = ProductListSerializer
+        expandable_fields = ['sellers', 'sellers_count', 'product_group_id', 'rating']
+
+    def prefetch_offers(self, products):
+        if not hasattr(self, '_offers'):
+            self._offers = {}
+
+        taxonomy_cache.attach(products)
+        group_field = Product._meta.get_field('group')
+        uncached = [
+            product for product in products
+            if product.group_id and not group_field.is_cached(product)
+        ]
+        group_fields = {'rating', 'min_price', 'max_price', 'total_stock'}
+        if uncached and group_fields & set(self.fields):
+            groups = ProductGroup.objects.in_bulk({product.group_id for product in uncached})
+            for product in uncached:
+                product.group = groups.get(product.group_id)
+
+        if 'sellers' not in self.fields and 'sellers_count' not in self.fields:
+            return
+        group_ids = {
+            product.group_id for product in products
+            if product.group_id and product.group_id not in self._offers
+        }
+        if not group_ids:
+            return
+
+        offers = defaultdict(list)
+        siblings = list(Product.objects.filter(
+            group_id__in=group_ids
+        ).select_related('seller').order_by('id'))
+        reserved = self.reserved_quantities(siblings)
+        for product in siblings:
+            offers[product.group_id].append(self.offer_data(product, reserved))
+        for group_id in group_ids:
+            self._offers[group_id] = offers[group_id]
+
+    def reserved_quantities(self, products):
+        if not self.live_stock:
+            return None
+        return reserved_quantities([product.id for product in products])
+
+    def offer_data(self, product, reserved):
+        offer = {
+            'seller_id': product.seller_id,
+            'shop_name': product.seller.shop_name,
+            'price': product.price,
+            'stock': product.stock,
+            'product_id': product.id
+        }
+        if reserved is not None:
+            offer['available_stock'] = max(product.stock - reserved.get(product.id, 0), 0)
+        return offer
+
+    def get_offers(self, obj):
+        if obj.group_id is None:
+            similar_products = Product.objects.filter(
+                name=obj.name,
+                category=obj.category,
+                subcategory=obj.subcategory
+            ).select_related('seller')
+            reserved = self.reserved_quantities(similar_products)
+            return [self.offer_data(product, reserved) for product in similar_products]
+
+        if obj.group_id not in getattr(self, '_offers', {}):
+            self.prefetch_offers([obj])
+        return self._offers[obj.group_id]
+
     def get_product_group_id(self, obj):
-        return f"{obj.name}-{obj.category.id}-{obj.subcategory.id}".lower().replace(' ', '-')
+        return f"{obj.name}-{obj.category_id}-{obj.subcategory_id}".lower().replace(' ', '-')
         
+    def get_group(self, obj):
+        return obj.group if obj.group_id else None
+
+    def get_rating(self, obj):
+        group = self.get_group(obj)
+        if group is None:
+            return None
+        return {
+            'count': group.rating_count,
+            'average': group.rating_average,
+            'histogram': group.rating_histogram
+        }
+
+    def get_min_price(self, obj):
+        group = self.get_group(obj)
+        return obj.price if group is None else group.min_price
+
+    def get_max_price(self, obj):
+        group = self.get_group(obj)
+        return obj.price if group is None else group.max_price
+
+    def get_total_stock(self, obj):
+        group = self.get_group(obj)
+        return obj.stock if group is None else group.total_stock
+
     def get_sellers_count(self, obj):
-        return Product.objects.filter(
-            name=obj.name,
-            category=obj.category,
-            subcategory=obj.subcategory
-        ).count()
+        return len(self.get_offers(obj))
 
     def get_sellers(self, obj):
-        similar_products = Product.objects.filter(
-            name=obj.name,
-            category=obj.category,
-            subcategory=obj.subcategory
-        ).select_related('seller')
-        
-        sellers_data = []
-        for product in similar_products:
-            sellers_data.append({
-                'seller_id': product.seller.id,
-                'shop_name': product.seller.shop_name,
-                'price': product.price,
-                'stock': product.stock,
-                'product_id': product.id
-            })
-        return sellers_data
+        return self.get_offers(obj)
 
     def get_category_id(self, obj):
-        return obj.category.id if obj.category else None
+        return obj.category_id
 
     def get_subcategory_id(self, obj):
-        return obj.subcategory.id if obj.subcategory else None
+        return obj.subcategory_id
 
     def validate(self, data):
         category_name = data.get('category', {}).get('name', '').strip()
@@ -85,22 +188,21 @@ class ProductSerializer(serializers.ModelSerializer):
         instance = getattr(self, 'instance', None)
 
         if category_name and subcategory_name and product_name:
-            try:
-                category = Category.objects.get(name=category_name)
-                subcategory = Subcategory.objects.get(name=subcategory_name, category=category)
-
-                if not instance and Product.objects.filter(
-                    name=product_name,
-                    category=category,
-                    subcategory=subcategory,
-                    seller=request.user.seller
-                ).exists():
-                    raise ValidationError(
-                        "شما قبلاً این محصول را در همین دسته‌بندی ثبت کرده‌اید."
-                    )
-
-            except (Category.DoesNotExist, Subcategory.DoesNotExist):
-                pass
+            category = taxonomy_cache.category_by_name(category_name)
+            subcategory = (
+                taxonomy_cache.subcategory_by_name(subcategory_name, category)
+                if category else None
+            )
+
+            if subcategory and not instance and Product.objects.filter(
+                name=product_name,
+                category=category,
+                subcategory=subcategory,
+                seller=request.user.seller
+            ).exists():
+                raise ValidationError(
+                    "شما قبلاً این محصول را در همین دسته‌بندی ثبت کرده‌اید."
+                )
 
         return data
 
@@ -109,10 +211,8 @@ class ProductSerializer(serializers.ModelSerializer):
         subcategory_name = validated_data.pop('subcategory', {}).get('name', '').strip()
         request = self.context.get('request')
 
-        category, _ = Category.objects.get_or_create(name=category_name)
-        subcategory, _ = Subcategory.objects.get_or_create(
-            name=subcategory_name, category=category
-        )
+        category = taxonomy_cache.get_or_create_category(category_name)
+        subcategory = taxonomy_cache.get_or_create_subcategory(subcategory_name, category)
 
         validated_data.pop('seller', None)
 
@@ -131,14 +231,12 @@ class ProductSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
 
         if category_name:
-            category, _ = Category.objects.get_or_create(name=category_name)
-            instance.category = category
+            instance.category = taxonomy_cache.get_or_create_category(category_name)
 
         if subcategory_name:
-            subcategory, _ = Subcategory.objects.get_or_create(
-                name=subcategory_name, category=instance.category
+            instance.subcategory = taxonomy_cache.get_or_create_subcategory(
+                subcategory_name, instance.category
             )
-            instance.subcategory = subcategory
 
         instance.name = validated_data.get('name', instance.name)
         instance.price = validated_data.get('price', instance.price)
@@ -146,12 +244,32 @@ class ProductSerializer(serializers.ModelSerializer):
         instance.save()
         return instance
     
-class CategorySerializer(serializers.ModelSerializer):
+class StockUpdateItemSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField(min_value=1)
+    delta = serializers.IntegerField(
+        required=False, min_value=-MAX_POSITIVE_INTEGER, max_value=MAX_POSITIVE_INTEGER
+    )
+    stock = serializers.IntegerField(required=False, min_value=0, max_value=MAX_POSITIVE_INTEGER)
+    price = serializers.IntegerField(required=False, min_value=0, max_value=MAX_POSITIVE_INTEGER)
+
+    def validate(self, data):
+        if 'delta' in data and 'stock' in data:
+            raise ValidationError("فقط یکی از delta یا stock را ارسال کنید.")
+        if not {'delta', 'stock', 'price'} & set(data):
+            raise ValidationError("حداقل یکی از delta، stock یا price الزامی است.")
+        return data
+
+
+class BulkStockUpdateSerializer(serializers.Serializer):
+    items = StockUpdateItemSerializer(many=True, allow_empty=False, max_length=1000)
+
+
+class CategorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = '__all__'
 
-class SubcategorySerializer(serializers.ModelSerializer):
+class SubcategorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Subcategory
-        fields = ['id', 'name', 'category']
\ No newline at end of file
+        fields = ['id', 'name', 'slug', 'category']
\ No newline at end of file
@@ -0,0 +1,149 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
+from django.dispatch import receiver
+from sellers.models import PaymentGateway, Seller, ShippingMethod
+from .models import Category, Product, ProductComment, ProductGroup, Subcategory
+from .price_history import record_prices
+from .versions import (
+    TAXONOMY_SCOPE, bump_catalog_versions, bump_group_versions, bump_version, comments_scope,
+    forget_product_group
+)
+
+
+def _update_group(group_id, search=False):
+    group = ProductGroup.objects.filter(pk=group_id).first()
+    if not group:
+        return
+    group.update_stats()
+    if search and group.pk:
+        group.update_search()
+
+
+@receiver(post_save, sender=Product)
+def sync_product_group(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    previous_group_id = instance.group_id
+    group = ProductGroup.for_product(instance)
+
+    if previous_group_id != group.id:
+        Product.objects.filter(pk=instance.pk).update(group=group)
+        instance.group = group
+        if previous_group_id:
+            forget_product_group(instance.pk)
+            _update_group(previous_group_id, search=True)
+        group.update_stats()
+        group.update_search()
+        ProductGroup.refresh_ratings([group_id for group_id in (previous_group_id, group.id) if group_id])
+    else:
+        group.update_stats()
+
+
+@receiver(post_save, sender=Product)
+def record_price_change(sender, instance, created, raw=False, **kwargs):
+    if raw or not (created or instance.price_changed):
+        return
+    record_prices([(instance.pk, instance.price)])
+    instance._loaded_price = instance.price
+
+
+@receiver(post_delete, sender=Product)
+def release_product_group(sender, instance, **kwargs):
+    if instance.group_id:
+        forget_product_group(instance.pk)
+        _update_group(instance.group_id, search=True)
+
+
+def _seller_group_ids(seller_id):
+    return list(Product.objects.filter(
+        seller_id=seller_id, group__isnull=False
+    ).values_list('group_id', flat=True).distinct())
+
+
+@receiver(post_save, sender=Seller)
+def sync_seller_search(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        instance._loaded_shop_name = instance.shop_name
+        return
+
+    group_ids = _seller_group_ids(instance.pk)
+    if instance.shop_name_changed:
+        if group_ids:
+            ProductGroup.refresh(group_ids)
+        instance._loaded_shop_name = instance.shop_name
+    bump_group_versions(group_ids)
+
+
+@receiver(pre_delete, sender=Seller)
+def remember_seller_groups(sender, instance, **kwargs):
+    instance._group_ids = _seller_group_ids(instance.pk)
+
+
+@receiver(post_delete, sender=Seller)
+def release_seller_groups(sender, instance, **kwargs):
+    bump_group_versions(getattr(instance, '_group_ids', ()))
+
+
+@receiver(post_save, sender=ShippingMethod)
+@receiver(post_delete, sender=ShippingMethod)
+@receiver(post_save, sender=PaymentGateway)
+@receiver(post_delete, sender=PaymentGateway)
+def bump_seller_options_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_group_versions(_seller_group_ids(instance.seller_id))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Subcategory)
+@receiver(post_delete, sender=Subcategory)
+def bump_taxonomy_version(sender, **kwargs):
+    transaction.on_commit(lambda: bump_version(TAXONOMY_SCOPE))
+
+
+@receiver(post_save, sender=ProductComment)
+@receiver(post_delete, sender=ProductComment)
+def bump_comments_version(sender, instance, **kwargs):
+    scope = comments_scope(instance.product_id)
+    transaction.on_commit(lambda: bump_version(scope))
+
+
+@receiver(pre_save, sender=ProductComment)
+def remember_comment_rating(sender, instance, raw=False, **kwargs):
+    instance._previous_rating = None
+    if instance.pk and not raw:
+        previous = ProductComment.objects.filter(pk=instance.pk).first()
+        if previous:
+            instance._previous_rating = previous.rating_contribution
+
+
+def _apply_comment_rating(product_id, previous, current):
+    if previous == current:
+        return
+    product = Product.objects.filter(pk=product_id).values('group_id', 'category_id').first()
+    if not product or not product['group_id']:
+        return
+    if previous:
+        ProductGroup.apply_rating(product['group_id'], previous, -1)
+    if current:
+        ProductGroup.apply_rating(product['group_id'], current, 1)
+    bump_catalog_versions([product['group_id']], [product['category_id']])
+
+
+@receiver(post_save, sender=ProductComment)
+def sync_comment_rating(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _apply_comment_rating(
+        instance.product_id,
+        getattr(instance, '_previous_rating', None),
+        instance.rating_contribution
+    )
+
+
+@receiver(post_delete, sender=ProductComment)
+def release_comment_rating(sender, instance, **kwargs):
+    _apply_comment_rating(instance.product_id, instance.rating_contribution, None)
@@ -0,0 +1,107 @@
+import bisect
+import heapq
+import threading
+import time
+from django.db import connection
+from .models import ProductGroup
+from .versions import CATALOG_SCOPE, get_version
+
+SUGGEST_REBUILD_INTERVAL = 30
+SUGGEST_MAX_RESULTS = 20
+SUGGEST_PRECOMPUTED_LENGTH = 3
+SUGGEST_SCAN_LIMIT = 256
+SUGGEST_MEMO_SIZE = 4096
+PREFIX_END = '\U0010ffff'
+
+
+class SuggestIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._built_at = 0
+        self._rebuilding = False
+        self._state = ([], [], {}, {})
+
+    def _refresh(self):
+        version = get_version(CATALOG_SCOPE)
+        if version == self._version:
+            return
+
+        if self._version is None:
+            with self._lock:
+                if self._version is None:
+                    self._rebuild(version)
+            return
+
+        if self._rebuilding or time.monotonic() - self._built_at < SUGGEST_REBUILD_INTERVAL:
+            return
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_in_background, args=(version,), daemon=True).start()
+
+    def _rebuild_in_background(self, version):
+        try:
+            self._rebuild(version)
+        finally:
+            self._rebuilding = False
+            connection.close()
+
+    def _rebuild(self, version):
+        rows = sorted(ProductGroup.objects.filter(
+            representative__isnull=False
+        ).exclude(normalized_name='').values_list(
+            'normalized_name', 'id', 'name', 'representative_id',
+            'category_id', 'subcategory_id', 'sellers_count'
+        ).iterator(chunk_size=5000))
+        names = [row[0] for row in rows]
+
+        top = {}
+        for position in sorted(range(len(rows)), key=lambda position: -rows[position][6]):
+            name = names[position]
+            for length in range(1, min(len(name), SUGGEST_PRECOMPUTED_LENGTH) + 1):
+                bucket = top.setdefault(name[:length], [])
+                if len(bucket) < SUGGEST_MAX_RESULTS:
+                    bucket.append(position)
+
+        self._state = (names, rows, top, {})
+        self._version = version
+        self._built_at = time.monotonic()
+
+    def _rank(self, rows, start, end, limit):
+        return heapq.nsmallest(
+            limit, range(start, end), key=lambda position: (-rows[position][6], position)
+        )
+
+    def suggest(self, prefix, limit=10):
+        self._refresh()
+        names, rows, top, memo = self._state
+        limit = min(limit, SUGGEST_MAX_RESULTS)
+
+        positions = top.get(prefix) or memo.get(prefix)
+        if positions is None:
+            start = bisect.bisect_left(names, prefix)
+            end = bisect.bisect_left(names, prefix + PREFIX_END, start)
+            if end - start <= SUGGEST_SCAN_LIMIT:
+                positions = self._rank(rows, start, end, limit)
+            else:
+                positions = self._rank(rows, start, end, SUGGEST_MAX_RESULTS)
+                if len(memo) < SUGGEST_MEMO_SIZE:
+                    memo[prefix] = positions
+
+        return [
+            {
+                'product_id': representative_id,
+                'product_group_id': group_id,
+                'name': name,
+                'category_id': category_id,
+                'subcategory_id': subcategory_id,
+                'sellers_count': sellers_count,
+            }
+            for _, group_id, name, representative_id, category_id, subcategory_id, sellers_count
+            in (rows[position] for position in positions[:limit])
+        ]
+
+
+suggest_index = SuggestIndex()
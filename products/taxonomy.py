@@ -0,0 +1,93 @@
+import threading
+from .models import Category, Subcategory
+from .versions import TAXONOMY_SCOPE, get_version
+
+
+class TaxonomyCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._categories = {}
+        self._subcategories = {}
+        self._categories_by_slug = {}
+        self._subcategories_by_slug = {}
+        self._categories_by_name = {}
+        self._subcategories_by_name = {}
+        self._subcategories_by_category_and_name = {}
+
+    def _refresh(self):
+        version = get_version(TAXONOMY_SCOPE)
+        if version == self._version:
+            return
+
+        with self._lock:
+            if version == self._version:
+                return
+            categories = list(Category.objects.order_by('-id'))
+            subcategories = list(Subcategory.objects.order_by('-id'))
+
+            self._categories = {obj.id: obj for obj in categories}
+            self._subcategories = {obj.id: obj for obj in subcategories}
+            self._categories_by_slug = {obj.slug: obj for obj in categories}
+            self._subcategories_by_slug = {obj.slug: obj for obj in subcategories}
+            self._categories_by_name = {obj.name: obj for obj in categories}
+            self._subcategories_by_name = {obj.name: obj for obj in subcategories}
+            self._subcategories_by_category_and_name = {
+                (obj.category_id, obj.name): obj for obj in subcategories
+            }
+            self._version = version
+
+    def category(self, pk):
+        self._refresh()
+        return self._categories.get(pk)
+
+    def subcategory(self, pk):
+        self._refresh()
+        return self._subcategories.get(pk)
+
+    def category_by_slug(self, slug):
+        self._refresh()
+        return (
+            self._categories_by_slug.get(slug)
+            or self._categories_by_name.get(slug.replace('-', ' '))
+        )
+
+    def subcategory_by_slug(self, slug):
+        self._refresh()
+        return (
+            self._subcategories_by_slug.get(slug)
+            or self._subcategories_by_name.get(slug.replace('-', ' '))
+        )
+
+    def category_by_name(self, name):
+        self._refresh()
+        return self._categories_by_name.get(name)
+
+    def subcategory_by_name(self, name, category=None):
+        self._refresh()
+        if category is None:
+            return self._subcategories_by_name.get(name)
+        return self._subcategories_by_category_and_name.get((category.id, name))
+
+    def get_or_create_category(self, name):
+        category = self.category_by_name(name)
+        if category is None:
+            category, _ = Category.objects.get_or_create(name=name)
+        return category
+
+    def get_or_create_subcategory(self, name, category):
+        subcategory = self.subcategory_by_name(name, category)
+        if subcategory is None:
+            subcategory, _ = Subcategory.objects.get_or_create(name=name, category=category)
+        return subcategory
+
+    def attach(self, products):
+        self._refresh()
+        for product in products:
+            if product.category_id in self._categories:
+                product.category = self._categories[product.category_id]
+            if product.subcategory_id in self._subcategories:
+                product.subcategory = self._subcategories[product.subcategory_id]
+
+
+taxonomy_cache = TaxonomyCache()
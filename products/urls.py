@@ -5,6 +5,7 @@ from .views import (
     CategoryListAPIView,
     SubcategoryListAPIView,
     ProductCommentsList,
+    CommentModerationView,
     delete_comment,
     user_comments
 )
@@ -22,6 +23,7 @@ urlpatterns = [
     path('<int:product_id>/comments/', ProductCommentsList.as_view(), name='product-comments'),
     path('user/comments/', user_comments, name='user-comments'),
     path('comments/<int:comment_id>/', delete_comment, name='delete-comment'),
+    path('comments/moderation/', CommentModerationView.as_view(), name='comment-moderation'),
 
 ]
 
@@ -0,0 +1,82 @@
+import time
+from django.core.cache import cache
+from django.db import transaction
+
+TAXONOMY_SCOPE = 'taxonomy'
+CATALOG_SCOPE = 'catalog'
+RECOMMENDATIONS_SCOPE = 'recommendations'
+PRICE_HISTORY_SCOPE = 'price-history'
+
+
+def category_scope(category_id):
+    return f'category:{category_id}'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def price_history_scope(group_id):
+    return f'price-history:{group_id}'
+
+
+def comments_scope(product_id):
+    return f'comments:{product_id}'
+
+
+def _version_key(scope):
+    return f'products:version:{scope}'
+
+
+def _group_of_key(product_id):
+    return f'products:group-of:{product_id}'
+
+
+def get_version(scope):
+    return get_versions([scope])[scope]
+
+
+def get_versions(scopes):
+    keys = {_version_key(scope): scope for scope in scopes}
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        for key, version in missing.items():
+            cache.add(key, version, timeout=None)
+        versions.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def bump_version(scope):
+    return bump_versions([scope])
+
+
+def bump_versions(scopes):
+    version = time.time_ns()
+    cache.set_many({_version_key(scope): version for scope in scopes}, timeout=None)
+    return version
+
+
+def bump_catalog_versions(group_ids=(), category_ids=()):
+    scopes = [CATALOG_SCOPE]
+    scopes += [group_scope(group_id) for group_id in set(group_ids) if group_id]
+    scopes += [category_scope(category_id) for category_id in set(category_ids) if category_id]
+    transaction.on_commit(lambda: bump_versions(scopes))
+
+
+def bump_group_versions(group_ids):
+    scopes = [group_scope(group_id) for group_id in set(group_ids) if group_id]
+    if scopes:
+        transaction.on_commit(lambda: bump_versions(scopes))
+
+
+def get_product_group(product_id):
+    return cache.get(_group_of_key(product_id))
+
+
+def remember_product_group(product_id, group_id):
+    cache.set(_group_of_key(product_id), group_id, timeout=None)
+
+
+def forget_product_group(product_id):
+    transaction.on_commit(lambda: cache.delete(_group_of_key(product_id)))
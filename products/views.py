@@ -1,18 +1,109 @@
 from rest_framework import viewsets
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from .models import Product, Category, Subcategory
+from .models import Product, Category, ProductGroup
 from django.shortcuts import get_object_or_404
-from .serializers import CategorySerializer, ProductSerializer, SubcategorySerializer
+from django.http import Http404
+from .serializers import CategorySerializer, ProductSerializer, SubcategorySerializer, BulkStockUpdateSerializer
 from rest_framework.views import APIView
 from sellers.serializers import SellerSerializer 
-from django.db.models import Min, Count
 from rest_framework import status
 from rest_framework import generics, permissions
 from .models import ProductComment
-from .serializers import ProductCommentSerializer, CreateProductCommentSerializer
+from .serializers import ProductCommentSerializer, CreateProductCommentSerializer, CommentModerationSerializer
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connection, transaction
+from django.db.models import F
+from .models import SEARCH_CONFIG
+from .normalization import normalize_persian, search_terms
+from .taxonomy import taxonomy_cache
+from .imports import IMPORT_FORMATS, ProductImporter
+from .inventory import apply_stock_updates, get_managed_seller_ids
+from .conditional import conditional_response
+from .response_cache import cache_stats
+from .facets import get_facets
+from .suggest import suggest_index
+from .recommendations import related_products
+from .price_history import PRICE_HISTORY_DEFAULT_DAYS, group_price_series
+from .moderation import approve_comments, reject_comments
+from .filters import ProductFilter, ProductGroupFilter
+from .pagination import KeysetCursorPagination
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.exceptions import ValidationError
+from .versions import (
+    CATALOG_SCOPE, PRICE_HISTORY_SCOPE, RECOMMENDATIONS_SCOPE, TAXONOMY_SCOPE, category_scope,
+    comments_scope, group_scope, price_history_scope, get_product_group, remember_product_group
+)
+from rest_framework.parsers import MultiPartParser
+from datetime import datetime, time, timedelta
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+import os
+
+SEARCH_TRIGRAM_THRESHOLD = 0.4
+SUGGEST_LIMIT = 10
+PRICE_HISTORY_MAX_DAYS = 366
+
+
+class OrderedCursorPagination(KeysetCursorPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering_param = 'ordering'
+    ordering_options = {}
+
+    def get_ordering(self, request, queryset, view):
+        ordering = request.query_params.get(self.ordering_param, 'name')
+        if ordering not in self.ordering_options:
+            raise ValidationError({
+                self.ordering_param: f'مقدار نامعتبر است. مقادیر مجاز: {", ".join(self.ordering_options)}'
+            })
+        return self.ordering_options[ordering]
+
+
+class ProductCursorPagination(OrderedCursorPagination):
+    ordering = ('name', 'id')
+    ordering_options = {
+        'name': ('name', 'id'),
+        'price': ('price', 'id'),
+        '-price': ('-price', '-id'),
+        'stock': ('-stock', '-id'),
+        'newest': ('-id',),
+    }
+
+
+class ProductGroupCursorPagination(OrderedCursorPagination):
+    ordering = ('name', 'id')
+    ordering_options = {
+        'name': ('name', 'id'),
+        'price': ('min_price', 'id'),
+        '-price': ('-min_price', '-id'),
+        'stock': ('-total_stock', '-id'),
+        'newest': ('-id',),
+    }
+
+
+class CommentCursorPagination(CursorPagination):
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class ModerationCursorPagination(CursorPagination):
+    ordering = ('created_at', 'id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class ProductSearchPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
 
 
 @api_view(['GET'])
@@ -26,6 +117,7 @@ def user_comments(request):
 
 class ProductCommentsList(generics.ListCreateAPIView):
     serializer_class = ProductCommentSerializer
+    pagination_class = CommentCursorPagination
 
     def get_permissions(self):
         if self.request.method == 'GET':
@@ -34,7 +126,10 @@ class ProductCommentsList(generics.ListCreateAPIView):
 
     def get_queryset(self):
         product_id = self.kwargs['product_id']
-        return ProductComment.objects.filter(product_id=product_id).select_related('user')
+        return ProductComment.objects.filter(
+            product_id=product_id,
+            is_approved=True
+        ).select_related('user', 'product')
 
     def perform_create(self, serializer):
         product_id = self.kwargs['product_id']
@@ -48,14 +143,50 @@ class ProductCommentsList(generics.ListCreateAPIView):
 
     def list(self, request, *args, **kwargs):
         try:
-            return super().list(request, *args, **kwargs)
+            return conditional_response(
+                request,
+                [comments_scope(self.kwargs['product_id'])],
+                lambda: super(ProductCommentsList, self).list(request, *args, **kwargs),
+                key=request.user.pk or '',
+                view=self
+            )
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+class CommentModerationView(generics.ListAPIView):
+    serializer_class = ProductCommentSerializer
+    pagination_class = ModerationCursorPagination
+    permission_classes = [IsAdminUser]
+
+    def get_queryset(self):
+        queryset = ProductComment.objects.filter(is_approved=False).select_related('user', 'product')
+        product_id = self.request.query_params.get('product')
+        if product_id and product_id.isdigit():
+            queryset = queryset.filter(product_id=product_id)
+        return queryset
+
+    def post(self, request):
+        serializer = CommentModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if serializer.validated_data['action'] == 'approve':
+            result = approve_comments(serializer.validated_data['ids'])
+        else:
+            result = reject_comments(serializer.validated_data['ids'])
+        return Response(result)
+
+
 class ProductViewSet(viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    pagination_class = ProductCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = ProductFilter
+
+    def filter_queryset(self, queryset):
+        if self.action != 'list':
+            return queryset
+        return super().filter_queryset(queryset)
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -63,17 +194,6 @@ class ProductViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(seller=self.request.user.seller)
             return queryset
         
-        if self.action == 'list':
-            distinct_products = Product.objects.values(
-                'name', 'category', 'subcategory'
-            ).annotate(
-                min_id=Min('id'),
-                sellers_count=Count('id', distinct=True)
-            ).order_by('name')
-
-            product_ids = [p['min_id'] for p in distinct_products if p['sellers_count'] > 0]
-            queryset = queryset.filter(id__in=product_ids)
-        
         category_name = self.request.query_params.get('category')
         subcategory_name = self.request.query_params.get('subcategory')
         
@@ -84,6 +204,41 @@ class ProductViewSet(viewsets.ModelViewSet):
         
         return queryset
     
+    def list(self, request, *args, **kwargs):
+        if hasattr(request.user, 'seller'):
+            render = lambda: super(ProductViewSet, self).list(request, *args, **kwargs)
+        else:
+            render = self.group_page
+        return conditional_response(
+            request,
+            [CATALOG_SCOPE, TAXONOMY_SCOPE],
+            render,
+            key=request.user.pk or '',
+            view=self
+        )
+
+    def group_page(self, **group_filters):
+        filterset = ProductGroupFilter(
+            self.request.query_params,
+            queryset=ProductGroup.objects.filter(representative__isnull=False, **group_filters)
+        )
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+
+        paginator = ProductGroupCursorPagination()
+        page = paginator.paginate_queryset(
+            filterset.qs.select_related('representative'), self.request, view=self
+        )
+        serializer = self.get_serializer(self.group_representatives(page), many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    def group_representatives(self, groups):
+        products = []
+        for group in groups:
+            group.representative.group = group
+            products.append(group.representative)
+        return products
+
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         
@@ -112,47 +267,219 @@ class ProductViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'], url_path='by-subcategory/(?P<subcategory_name>[^/]+)')
     def by_subcategory(self, request, subcategory_name=None):
-        subcategory_name = subcategory_name.replace('-', ' ')
-        subcategory = get_object_or_404(Subcategory, name=subcategory_name)
-        distinct_products = Product.objects.filter(
-            subcategory=subcategory
-        ).values(
-            'name', 'category', 'subcategory'
-        ).annotate(
-            min_id=Min('id')
+        subcategory = taxonomy_cache.subcategory_by_slug(subcategory_name)
+        if subcategory is None:
+            raise Http404
+        return conditional_response(
+            request,
+            [category_scope(subcategory.category_id), TAXONOMY_SCOPE],
+            lambda: self.group_page(subcategory=subcategory),
+            view=self
         )
-        
-        product_ids = [p['min_id'] for p in distinct_products]
-        products = Product.objects.filter(id__in=product_ids, subcategory=subcategory)
-        
-        serializer = self.get_serializer(products, many=True)
-        return Response(serializer.data)
 
     @action(detail=False, methods=['get'], url_path='by-category/(?P<category_name>[^/]+)')
     def by_category(self, request, category_name=None):
-        category_name = category_name.replace('-', ' ')
-        category = get_object_or_404(Category, name=category_name)
-        distinct_products = Product.objects.filter(
-            category=category
-        ).values(
-            'name', 'category', 'subcategory'
-        ).annotate(
-            min_id=Min('id')
+        category = taxonomy_cache.category_by_slug(category_name)
+        if category is None:
+            raise Http404
+        return conditional_response(
+            request,
+            [category_scope(category.id), TAXONOMY_SCOPE],
+            lambda: self.group_page(category=category),
+            view=self
         )
-        
-        product_ids = [p['min_id'] for p in distinct_products]
-        products = Product.objects.filter(id__in=product_ids, category=category)
-        serializer = self.get_serializer(products, many=True)
-        return Response(serializer.data)
     
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_products(self, request):
+        if not hasattr(request.user, 'seller'):
+            return Response(
+                {'error': 'فقط فروشندگان می‌توانند محصول وارد کنند.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'فایل الزامی است'}, status=status.HTTP_400_BAD_REQUEST)
+
+        file_format = request.data.get('format') or os.path.splitext(upload.name)[1].lstrip('.').lower()
+        if file_format not in IMPORT_FORMATS:
+            return Response(
+                {'error': f'فرمت فایل نامعتبر است. فرمت‌های مجاز: {", ".join(IMPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        report = ProductImporter(request.user.seller).run(upload, file_format)
+        return Response(report)
+
+    @action(detail=False, methods=['post'], url_path='bulk-update')
+    def bulk_update_stock(self, request):
+        seller_ids = get_managed_seller_ids(request.user) if request.user.is_authenticated else set()
+        if not seller_ids:
+            return Response(
+                {'error': 'فقط فروشندگان و انبارداران می‌توانند موجودی را تغییر دهند.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = BulkStockUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = apply_stock_updates(serializer.validated_data['items'], seller_ids)
+        updated = sum(1 for result in results if result['success'])
+        return Response({
+            'updated': updated,
+            'failed': len(results) - updated,
+            'results': results
+        })
+
+    @action(detail=False, methods=['get'], url_path='facets')
+    def facets(self, request):
+        filterset = ProductGroupFilter(request.query_params, queryset=ProductGroup.objects.all())
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+        return conditional_response(
+            request,
+            [CATALOG_SCOPE, TAXONOMY_SCOPE],
+            lambda: Response(get_facets(filterset.qs, filterset.form.cleaned_data))
+        )
+
+    @action(detail=False, methods=['get'], url_path='cache-stats', permission_classes=[IsAdminUser])
+    def response_cache_stats(self, request):
+        return Response(cache_stats())
+
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request):
+        terms = search_terms(request.query_params.get('q', ''))
+        if not terms:
+            return Response(
+                {'error': 'عبارت جستجو الزامی است'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SET LOCAL pg_trgm.word_similarity_threshold = %s',
+                    [SEARCH_TRIGRAM_THRESHOLD]
+                )
+            query = SearchQuery(
+                ' & '.join(f'{term}:*' for term in terms),
+                search_type='raw',
+                config=SEARCH_CONFIG
+            )
+            groups = ProductGroup.objects.filter(search_vector=query).annotate(
+                rank=SearchRank(F('search_vector'), query)
+            )
+            if not groups.exists():
+                text = ' '.join(terms)
+                groups = ProductGroup.objects.filter(
+                    search_document__trigram_word_similar=text
+                ).annotate(
+                    rank=TrigramWordSimilarity(text, 'search_document')
+                )
+
+            groups = groups.filter(
+                representative__isnull=False
+            ).select_related('representative').order_by('-rank', '-sellers_count', 'id')
+
+            paginator = ProductSearchPagination()
+            page = paginator.paginate_queryset(groups, request, view=self)
+            serializer = self.get_serializer(self.group_representatives(page), many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path='suggest')
+    def suggest(self, request):
+        prefix = normalize_persian(request.query_params.get('prefix', ''))
+        if not prefix:
+            return Response(
+                {'error': 'پیشوند جستجو الزامی است'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limit = max(int(request.query_params.get('limit', SUGGEST_LIMIT)), 1)
+        except ValueError:
+            limit = SUGGEST_LIMIT
+        return Response(suggest_index.suggest(prefix, limit))
+
     @action(detail=True, methods=['get'], url_path='sellers')
     def product_sellers(self, request, pk=None):
+        group_id = self.product_group_id(pk)
+        return conditional_response(
+            request,
+            [group_scope(group_id) if group_id else CATALOG_SCOPE],
+            lambda: self.render_product_sellers(request),
+            key=request.user.pk or '',
+            view=self
+        )
+
+    @action(detail=True, methods=['get'], url_path='related')
+    def related(self, request, pk=None):
+        group_id = self.product_group_id(pk)
+        if not group_id:
+            return Response([])
+        return conditional_response(
+            request,
+            [CATALOG_SCOPE, RECOMMENDATIONS_SCOPE],
+            lambda: Response(related_products(group_id)),
+            view=self
+        )
+
+    @action(detail=True, methods=['get'], url_path='price-history')
+    def price_history(self, request, pk=None):
+        today = timezone.localdate()
+        params = request.query_params
+        try:
+            end = parse_date(params['to']) if 'to' in params else today
+            start = (
+                parse_date(params['from']) if 'from' in params
+                else end - timedelta(days=PRICE_HISTORY_DEFAULT_DAYS)
+            )
+        except ValueError:
+            start = end = None
+        if start is None or end is None or start > end:
+            return Response(
+                {'error': 'بازه تاریخ نامعتبر است'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if (end - start).days > PRICE_HISTORY_MAX_DAYS:
+            return Response(
+                {'error': f'بازه تاریخ حداکثر {PRICE_HISTORY_MAX_DAYS} روز است'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        group_id = self.product_group_id(pk)
+        if not group_id:
+            return Response([])
+
+        tz = timezone.get_current_timezone()
+        return conditional_response(
+            request,
+            [PRICE_HISTORY_SCOPE, price_history_scope(group_id)],
+            lambda: Response(group_price_series(
+                group_id,
+                datetime.combine(start, time.min, tzinfo=tz),
+                datetime.combine(end + timedelta(days=1), time.min, tzinfo=tz)
+            )),
+            view=self
+        )
+
+    def product_group_id(self, pk):
+        group_id = get_product_group(pk)
+        if group_id is None:
+            group_id = self.get_object().group_id
+            if group_id:
+                remember_product_group(pk, group_id)
+        return group_id
+
+    def render_product_sellers(self, request):
         product = self.get_object()
-        similar_products = Product.objects.filter(
-            name=product.name,
-            category=product.category,
-            subcategory=product.subcategory
-        ).select_related('seller')
+        if product.group_id:
+            similar_products = Product.objects.filter(group_id=product.group_id)
+        else:
+            similar_products = Product.objects.filter(
+                name=product.name,
+                category=product.category,
+                subcategory=product.subcategory
+            )
+        similar_products = similar_products.select_related('seller', 'seller__user')
 
         sellers_data = []
         for p in similar_products:
@@ -170,23 +497,26 @@ class ProductViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['patch'], url_path='update-stock')
     def update_stock(self, request, pk=None):
         try:
-            product = Product.objects.get(id=pk)
             quantity = int(request.data.get('quantity', 0))
-            
-            if product.stock < quantity:
+            updated = Product.objects.filter(id=pk, stock__gte=quantity).update(
+                stock=F('stock') - quantity
+            )
+            product = Product.objects.get(id=pk)
+
+            if not updated:
                 return Response(
                     {'error': f'موجودی کافی نیست (موجودی: {product.stock}, درخواستی: {quantity})'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            
-            product.stock -= quantity
-            product.save()
+
+            if product.group_id:
+                ProductGroup.refresh([product.group_id])
             
             return Response({
                 'message': 'موجودی با موفقیت به‌روزرسانی شد',
                 'new_stock': product.stock,
                 'product_id': product.id,
-                'seller_id': product.seller.id
+                'seller_id': product.seller_id
             })
             
         except Product.DoesNotExist:
@@ -201,9 +531,17 @@ class ProductViewSet(viewsets.ModelViewSet):
             )
 class CategoryListAPIView(APIView):
     def get(self, request, category_name=None):
-        category = get_object_or_404(Category, name=category_name)  
-        serializer = CategorySerializer(category)
-        return Response(serializer.data)
+        category = (
+            taxonomy_cache.category_by_name(category_name)
+            or taxonomy_cache.category_by_slug(category_name)
+        )
+        if category is None:
+            raise Http404
+        return conditional_response(
+            request,
+            [TAXONOMY_SCOPE],
+            lambda: Response(CategorySerializer(category).data)
+        )
 
 class CategoryViewSet(viewsets.ModelViewSet):
     queryset = Category.objects.all()
@@ -211,9 +549,17 @@ class CategoryViewSet(viewsets.ModelViewSet):
 
 class SubcategoryListAPIView(APIView):
     def get(self, request, subcategory_name=None):
-        subcategory = get_object_or_404(Subcategory, name=subcategory_name)  
-        serializer = SubcategorySerializer(subcategory)
-        return Response(serializer.data)
+        subcategory = (
+            taxonomy_cache.subcategory_by_name(subcategory_name)
+            or taxonomy_cache.subcategory_by_slug(subcategory_name)
+        )
+        if subcategory is None:
+            raise Http404
+        return conditional_response(
+            request,
+            [TAXONOMY_SCOPE],
+            lambda: Response(SubcategorySerializer(subcategory).data)
+        )
     
 
 @api_view(['DELETE'])
@@ -0,0 +1,183 @@
+import base64
+import io
+import binascii
+import hashlib
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+LOGO_ROOT = 'shop_logos'
+LOGO_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+THUMBNAIL_SIZES = {'small': 64, 'medium': 256}
+THUMBNAIL_FORMATS = {'webp': 'WEBP', 'jpeg': 'JPEG'}
+DECODE_CHUNK_SIZE = 64 * 1024
+MAX_IMAGE_PIXELS = 40_000_000
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_WORKERS,
+    thread_name_prefix='logo-thumbnails'
+)
+
+
+class InvalidImage(Exception):
+    pass
+
+
+def decode_data_uri(value):
+    header, _, payload = value.partition(';base64,')
+    if not payload or not header.startswith('data:image/'):
+        raise InvalidImage('فرمت تصویر نامعتبر است')
+
+    content_type = header[len('data:'):]
+    if len(payload) * 3 // 4 > settings.LOGO_MAX_UPLOAD_SIZE:
+        raise InvalidImage('حجم تصویر بیش از حد مجاز است')
+
+    extension = content_type.split('/')[-1]
+    upload = TemporaryUploadedFile(f'logo.{extension}', content_type, 0, None)
+    size = 0
+    step = DECODE_CHUNK_SIZE - DECODE_CHUNK_SIZE % 4
+    try:
+        for start in range(0, len(payload), step):
+            chunk = base64.b64decode(payload[start:start + step], validate=True)
+            size += len(chunk)
+            upload.write(chunk)
+    except (binascii.Error, ValueError):
+        upload.close()
+        raise InvalidImage('فرمت تصویر نامعتبر است')
+
+    upload.size = size
+    upload.seek(0)
+    return upload
+
+
+def inspect_image(upload):
+    if upload.size > settings.LOGO_MAX_UPLOAD_SIZE:
+        raise InvalidImage('حجم تصویر بیش از حد مجاز است')
+
+    digest = hashlib.sha256()
+    upload.seek(0)
+    for chunk in upload.chunks():
+        digest.update(chunk)
+    upload.seek(0)
+
+    try:
+        with Image.open(upload) as image:
+            image_format = image.format
+            width, height = image.size
+            image.verify()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise InvalidImage('فایل ارسالی تصویر معتبر نیست')
+    finally:
+        upload.seek(0)
+
+    if image_format not in LOGO_FORMATS:
+        raise InvalidImage('فرمت تصویر پشتیبانی نمی‌شود')
+    if width * height > MAX_IMAGE_PIXELS:
+        raise InvalidImage('ابعاد تصویر بیش از حد مجاز است')
+    return digest.hexdigest(), LOGO_FORMATS[image_format]
+
+
+def original_path(digest, extension):
+    return posixpath.join(LOGO_ROOT, 'originals', digest[:2], f'{digest}.{extension}')
+
+
+def thumbnail_path(digest, size_name, format_name):
+    extension = 'jpg' if format_name == 'jpeg' else format_name
+    return posixpath.join(LOGO_ROOT, 'thumbnails', digest[:2], digest, f'{size_name}.{extension}')
+
+
+def thumbnail_urls(digest):
+    return {
+        size_name: {
+            format_name: default_storage.url(thumbnail_path(digest, size_name, format_name))
+            for format_name in THUMBNAIL_FORMATS
+        }
+        for size_name in THUMBNAIL_SIZES
+    }
+
+
+def thumbnails_exist(digest):
+    return all(
+        default_storage.exists(thumbnail_path(digest, size_name, format_name))
+        for size_name in THUMBNAIL_SIZES
+        for format_name in THUMBNAIL_FORMATS
+    )
+
+
+def store_logo(seller, upload, schedule=True):
+    digest, extension = getattr(upload, 'image_info', None) or inspect_image(upload)
+    path = original_path(digest, extension)
+    if not default_storage.exists(path):
+        path = default_storage.save(path, File(upload))
+
+    seller.logo.name = path
+    seller.logo_hash = digest
+    seller.logo_thumbnails_ready = thumbnails_exist(digest)
+    if schedule and not seller.logo_thumbnails_ready:
+        transaction.on_commit(lambda: schedule_thumbnails(digest, path))
+    return seller
+
+
+def schedule_thumbnails(digest, path):
+    return _executor.submit(_thumbnail_job, digest, path)
+
+
+def _thumbnail_job(digest, path):
+    try:
+        generate_thumbnails(digest, path)
+        mark_thumbnails_ready(digest)
+    except Exception:
+        logger.exception('Could not generate logo thumbnails for %s', digest)
+    finally:
+        close_old_connections()
+
+
+def generate_thumbnails(digest, path):
+    with default_storage.open(path) as original, Image.open(original) as image:
+        image = ImageOps.exif_transpose(image)
+        for size_name, size in THUMBNAIL_SIZES.items():
+            thumbnail = image.copy()
+            thumbnail.thumbnail((size, size), Image.LANCZOS)
+            for format_name, pillow_format in THUMBNAIL_FORMATS.items():
+                target = thumbnail_path(digest, size_name, format_name)
+                if default_storage.exists(target):
+                    continue
+                frame = thumbnail
+                if pillow_format == 'JPEG' and frame.mode != 'RGB':
+                    frame = _flatten(frame)
+                buffer = io.BytesIO()
+                frame.save(buffer, pillow_format, quality=85)
+                default_storage.save(target, ContentFile(buffer.getvalue()))
+
+
+def _flatten(image):
+    image = image.convert('RGBA')
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def mark_thumbnails_ready(digest):
+    from products.models import Product
+    from products.versions import bump_versions, group_scope
+    from .models import Seller
+
+    updated = Seller.objects.filter(logo_hash=digest, logo_thumbnails_ready=False).update(
+        logo_thumbnails_ready=True
+    )
+    if not updated:
+        return
+    group_ids = Product.objects.filter(
+        seller__logo_hash=digest, group__isnull=False
+    ).values_list('group_id', flat=True).distinct()
+    scopes = [group_scope(group_id) for group_id in group_ids]
+    if scopes:
+        bump_versions(scopes)
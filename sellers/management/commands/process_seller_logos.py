@@ -0,0 +1,34 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from sellers.images import InvalidImage, generate_thumbnails, mark_thumbnails_ready, store_logo
+from sellers.models import Seller
+
+
+class Command(BaseCommand):
+    help = 'Move existing seller logos to content-hash storage and generate missing thumbnails'
+
+    def handle(self, *args, **options):
+        moved = 0
+        for seller in Seller.objects.exclude(logo='').exclude(logo=None).filter(logo_hash=''):
+            if not default_storage.exists(seller.logo.name):
+                self.stderr.write(f'Missing logo file for seller {seller.pk}: {seller.logo.name}')
+                continue
+            try:
+                with seller.logo.open('rb') as logo:
+                    store_logo(seller, logo, schedule=False)
+            except InvalidImage as e:
+                self.stderr.write(f'Skipping seller {seller.pk}: {e}')
+                continue
+            seller.save(update_fields=['logo', 'logo_hash', 'logo_thumbnails_ready'])
+            moved += 1
+
+        pending = Seller.objects.filter(logo_thumbnails_ready=False).exclude(logo_hash='')
+        generated = 0
+        for digest, path in pending.values_list('logo_hash', 'logo').distinct():
+            generate_thumbnails(digest, path)
+            mark_thumbnails_ready(digest)
+            generated += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Moved {moved} logos, generated thumbnails for {generated} images'
+        ))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sellers', '0003_alter_seller_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seller',
+            name='logo_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='seller',
+            name='logo_thumbnails_ready',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
@@ -5,6 +5,8 @@ class Seller(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='seller')
     shop_name = models.CharField(max_length=255, verbose_name="نام فروشگاه")
     logo = models.ImageField(upload_to='shop_logos/', null=True, blank=True, verbose_name="لوگو فروشگاه")
+    logo_hash = models.CharField(max_length=64, blank=True, db_index=True, editable=False)
+    logo_thumbnails_ready = models.BooleanField(default=False, editable=False)
     phone = models.CharField(max_length=15, verbose_name="تلفن")
     address = models.TextField(verbose_name="آدرس")
     description = models.TextField(blank=True, verbose_name="توضیحات")
@@ -14,6 +16,16 @@ class Seller(models.Model):
     def __str__(self):
         return self.shop_name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_shop_name = instance.__dict__.get('shop_name')
+        return instance
+
+    @property
+    def shop_name_changed(self):
+        return self.shop_name != getattr(self, '_loaded_shop_name', None)
+
     class Meta:
         verbose_name = 'فروشنده'
         verbose_name_plural = 'فروشندگان'
@@ -1,8 +1,7 @@
 from rest_framework import serializers
 from sellers.models import PaymentGateway, Seller, ShippingMethod
-import base64
-from django.core.files.base import ContentFile
-import uuid
+from backend.serializers import DynamicFieldsMixin
+from .images import InvalidImage, decode_data_uri, inspect_image, store_logo, thumbnail_urls
 
 class ShippingMethodSerializer(serializers.ModelSerializer):
     class Meta:
@@ -14,24 +13,31 @@ class PaymentGatewaySerializer(serializers.ModelSerializer):
         model = PaymentGateway
         fields = ['id', 'name']
 
-class SellerSerializer(serializers.ModelSerializer):
+class SellerSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     price = serializers.SerializerMethodField()
     stock = serializers.SerializerMethodField()
     shipping_methods = ShippingMethodSerializer(many=True, read_only=True)
     payment_gateways = PaymentGatewaySerializer(many=True, read_only=True)
     logo = serializers.ImageField(required=False, allow_null=True)
+    logo_thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = Seller
         fields = [
-            'id', 'shop_name', 'logo', 'phone', 'address', 
+            'id', 'shop_name', 'logo', 'logo_thumbnails', 'phone', 'address',
             'description', 'min_order_amount', 'is_active',
             'shipping_methods', 'payment_gateways', 'price', 'stock'
         ]
         extra_kwargs = {
             'logo': {'write_only': True, 'required': False, 'allow_null': True}
         }
-        
+        expandable_fields = ['price', 'stock', 'shipping_methods', 'payment_gateways']
+
+    def get_logo_thumbnails(self, obj):
+        if not obj.logo_hash or not obj.logo_thumbnails_ready:
+            return None
+        return thumbnail_urls(obj.logo_hash)
+
     def get_price(self, obj):
         product = self.get_related_product(obj)
         return product.price if product else None
@@ -51,20 +57,35 @@ class SellerSerializer(serializers.ModelSerializer):
             subcategory_id=subcategory_id
         ).first()
         
+    def validate_logo(self, value):
+        if value:
+            try:
+                value.image_info = inspect_image(value)
+            except InvalidImage as e:
+                raise serializers.ValidationError(str(e))
+        return value
+
+    def create(self, validated_data):
+        logo = validated_data.pop('logo', None)
+        seller = super().create(validated_data)
+        if logo:
+            store_logo(seller, logo)
+            seller.save(update_fields=['logo', 'logo_hash', 'logo_thumbnails_ready'])
+        return seller
+
+    def update(self, instance, validated_data):
+        logo = validated_data.pop('logo', None)
+        if logo:
+            store_logo(instance, logo)
+        return super().update(instance, validated_data)
+
     def to_internal_value(self, data):
         if 'logo' in data and isinstance(data['logo'], str) and data['logo'].startswith('data:image'):
             try:
-                format, imgstr = data['logo'].split(';base64,')
-                ext = format.split('/')[-1]
-                
-                filename = f"{uuid.uuid4()}.{ext}"
-                data['logo'] = ContentFile(
-                    base64.b64decode(imgstr),
-                    name=filename
-                )
-            except Exception as e:
-                raise serializers.ValidationError({
-                    'logo': 'فرمت تصویر نامعتبر است'
-                })
+                logo = decode_data_uri(data['logo'])
+            except InvalidImage as e:
+                raise serializers.ValidationError({'logo': str(e)})
+            data = data.copy()
+            data['logo'] = logo
 
-        return super().to_internal_value(data)
\ No newline at end of file
+        return super().to_internal_value(data)
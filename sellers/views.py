@@ -55,11 +55,6 @@ class SellerSettingsView(generics.RetrieveUpdateAPIView):
         instance = self.get_object()
         serializer = self.get_serializer(instance, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-        
-        logo = serializer.validated_data.get('logo')
-        if logo:
-            instance.logo.save(logo.name, logo, save=False)
-        
         self.perform_update(serializer)
         
         return Response(serializer.data)
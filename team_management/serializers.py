@@ -2,23 +2,25 @@ from rest_framework import serializers
 from sellers.models import Seller
 from sellers.serializers import SellerSerializer
 from django.contrib.auth import get_user_model
+from backend.serializers import DynamicFieldsMixin
 
 from team_management.models import StoreRole
 
 User = get_user_model()
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'first_name', 'last_name', 'email']
 
-class StoreRoleSerializer(serializers.ModelSerializer):
+class StoreRoleSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     seller = SellerSerializer(read_only=True)
     
     class Meta:
         model = StoreRole
         fields = ['id', 'user', 'seller', 'role', 'is_active', 'created_at']
+        expandable_fields = ['seller']
 
 class CreateStoreRoleSerializer(serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
@@ -36,8 +36,8 @@ class StoreRoleListView(APIView):
     def get(self, request):
         try:
             seller = Seller.objects.get(user=request.user)
-            roles = StoreRole.objects.filter(seller=seller)
-            serializer = StoreRoleSerializer(roles, many=True)
+            roles = StoreRole.objects.filter(seller=seller).select_related('user', 'seller')
+            serializer = StoreRoleSerializer(roles, many=True, context={'request': request})
             return Response(serializer.data)
         except Seller.DoesNotExist:
             return Response(
@@ -16,6 +16,7 @@ from rest_framework.decorators import api_view, permission_classes
 from django.utils import timezone
 from .models import Discount
 from order.models import Order
+from order.idempotency import idempotent
 from .permissions import IsSellerOrAdmin
 
 class TicketPagination(PageNumberPagination):
@@ -250,6 +251,7 @@ class DiscountViewSet(viewsets.ModelViewSet):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@idempotent('discount-apply')
 def apply_discount(request):
     code = request.data.get('code')
     seller_id = request.data.get('seller_id') or request.data.get('store_id')